@@ -0,0 +1,112 @@
+"""Benchmark del tiempo de arranque en frío del CLI de pruebas.
+
+Ejecuta varias veces subcomandos que no hacen solicitudes y mide el tiempo total
+del proceso. Con --record añade la medición al historial versionado en
+startup_benchmark.json; con --check falla si el arranque supera el presupuesto o
+si algún módulo pesado se importa sin necesidad.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "test_api.py")
+HISTORY = os.path.join(HERE, "startup_benchmark.json")
+
+# Subcomandos medidos: ninguno debería cargar el cliente HTTP
+CASES = {
+    "help": ["--help"],
+    "list": ["list"],
+}
+
+# Módulos que no deben importarse al arrancar
+HEAVY_MODULES = ("requests", "urllib3", "http.server", "load_runner", "report_html", "schemas")
+
+
+def measure(argv, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT] + argv, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure_interpreter(runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def imported_heavy_modules(argv):
+    """Módulos pesados importados por el proceso, según -X importtime"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", SCRIPT] + argv,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imported = {line.rsplit("|", 1)[-1].strip() for line in completed.stderr.splitlines() if "|" in line}
+    return sorted(module for module in HEAVY_MODULES if module in imported)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15, help="Ejecuciones por subcomando")
+    parser.add_argument("--record", action="store_true", help="Añadir la medición al historial")
+    parser.add_argument("--check", action="store_true",
+                        help="Fallar si se supera el presupuesto o se importan módulos pesados")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Mediana máxima permitida por subcomando (ms)")
+    args = parser.parse_args()
+
+    # Referencia: arranque del intérprete sin hacer nada
+    baseline = measure_interpreter(args.runs)
+    entry = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "interpreter_ms": round(statistics.median(baseline), 1),
+        "cases": {},
+    }
+
+    failures = []
+    for name, argv in CASES.items():
+        timings = measure(argv, args.runs)
+        heavy = imported_heavy_modules(argv)
+        median = statistics.median(timings)
+        entry["cases"][name] = {
+            "median_ms": round(median, 1),
+            "min_ms": round(min(timings), 1),
+            "heavy_imports": heavy,
+        }
+        print(f"{name:<6} mediana {median:7.1f} ms  mín {min(timings):7.1f} ms  "
+              f"(intérprete {entry['interpreter_ms']} ms)  pesados: {', '.join(heavy) or 'ninguno'}")
+        if median > args.budget_ms:
+            failures.append(f"{name}: {median:.1f} ms supera el presupuesto de {args.budget_ms} ms")
+        if heavy:
+            failures.append(f"{name}: importa {', '.join(heavy)} al arrancar")
+
+    if args.record:
+        history = []
+        if os.path.exists(HISTORY):
+            with open(HISTORY) as f:
+                history = json.load(f)
+        history.append(entry)
+        with open(HISTORY, "w") as f:
+            json.dump(history, f, indent=2)
+            f.write("\n")
+        print(f"Medición añadida a {HISTORY}")
+
+    if args.check and failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
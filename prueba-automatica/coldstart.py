@@ -0,0 +1,173 @@
+"""Sonda de arranque en frío y de despertar tras inactividad (Railway).
+
+Para cada intervalo de inactividad configurado la sonda deja de enviar tráfico,
+mide la primera solicitud sin reintentos (los reintentos de make_request
+ocultarían el fallo) y después la curva de calentamiento de las N siguientes.
+Incluye un servidor local que simula arranques en frío para probar sin red.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from results import format_ms, percentile
+from test_api import ApiTester
+
+
+class ColdStartServer:
+    """Servidor de pruebas que se "duerme" tras idle_after segundos sin tráfico.
+
+    La primera solicitud tras dormir tarda cold_delay segundos (y las
+    cold_failures primeras responden 502, como el proxy de Railway mientras el
+    contenedor arranca). Después la latencia baja de warm_penalty a base_latency
+    a medida que el proceso se calienta.
+    """
+
+    def __init__(self, idle_after=5.0, cold_delay=2.0, cold_failures=0, base_latency=0.01,
+                 warm_penalty=0.2, warm_decay=0.6, port=0):
+        self.idle_after = idle_after
+        self.cold_delay = cold_delay
+        self.cold_failures = cold_failures
+        self.base_latency = base_latency
+        self.warm_penalty = warm_penalty
+        self.warm_decay = warm_decay
+        self._lock = threading.Lock()
+        self._last_request = None
+        self._pending_failures = 0
+        self._served_since_wake = 0
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                status, delay = stand_in._next_response()
+                time.sleep(delay)
+                body = json.dumps({"status": "healthy" if status == 200 else "starting"}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _next_response(self):
+        now = time.monotonic()
+        with self._lock:
+            asleep = self._last_request is None or now - self._last_request > self.idle_after
+            self._last_request = now
+            if asleep:
+                self._pending_failures = self.cold_failures
+                self._served_since_wake = 0
+                delay = self.cold_delay
+            else:
+                delay = self.base_latency + self.warm_penalty * self.warm_decay ** self._served_since_wake
+            self._served_since_wake += 1
+            if self._pending_failures:
+                self._pending_failures -= 1
+                return 502, delay
+            return 200, delay
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="coldstart-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def timed_request(tester, endpoint, timeout):
+    start = time.perf_counter()
+    try:
+        status = tester.send_request("GET", endpoint, timeout=timeout).status_code
+    except Exception as e:
+        return {"status": "error", "ms": (time.perf_counter() - start) * 1000, "error": str(e)}
+    return {"status": status, "ms": (time.perf_counter() - start) * 1000}
+
+
+def probe_once(base_url, endpoint, warmup_requests, timeout=60, max_attempts=10):
+    """Primera solicitud tras la inactividad, tiempo hasta el primer éxito y curva de calentamiento"""
+    # Un probador nuevo abre conexiones nuevas, como un cliente que llega tras la pausa.
+    # La sesión (y el import de requests) se crea antes de medir para no sumarla a la primera solicitud.
+    tester = ApiTester(base_url)
+    tester.open_session()
+    started = time.perf_counter()
+    first = timed_request(tester, endpoint, timeout)
+
+    attempts = 1
+    result = first
+    while result["status"] != 200 and attempts < max_attempts:
+        time.sleep(1)
+        result = timed_request(tester, endpoint, timeout)
+        attempts += 1
+
+    curve = [round(timed_request(tester, endpoint, timeout)["ms"], 1) for _ in range(warmup_requests)]
+    steady = sorted(curve[len(curve) // 2:])
+    steady_ms = percentile(steady, 50)
+
+    probe = {
+        "first_status": first["status"],
+        "first_ms": round(first["ms"], 1),
+        "attempts_to_success": attempts if result["status"] == 200 else None,
+        "time_to_success_ms": round((time.perf_counter() - started) * 1000, 1) if result["status"] == 200 else None,
+        "warmup_curve_ms": curve,
+        "steady_ms": steady_ms,
+        "cold_penalty_ms": round(first["ms"] - steady_ms, 1) if steady_ms is not None else None,
+    }
+    if "error" in first:
+        probe["first_error"] = first["error"]
+    return probe
+
+
+def probe_cold_starts(base_url, gaps, warmup_requests=20, endpoint="/health", cycles=1,
+                      penalty_threshold_ms=1000):
+    print(f"Sonda de arranque en frío contra {base_url}{endpoint}")
+    report = {"base_url": base_url, "endpoint": endpoint, "gaps_s": list(gaps),
+              "warmup_requests": warmup_requests, "probes": []}
+
+    for cycle in range(1, cycles + 1):
+        for gap in gaps:
+            if gap:
+                print(f"\n  ⏳ Ciclo {cycle}: esperando {gap:g}s sin tráfico...")
+                time.sleep(gap)
+            probe = probe_once(base_url, endpoint, warmup_requests)
+            probe.update({"cycle": cycle, "gap_s": gap})
+            report["probes"].append(probe)
+            print(f"  gap {gap:>6g}s  primera: {probe['first_status']} en {format_ms(probe['first_ms'])} ms  "
+                  f"éxito tras {probe['attempts_to_success'] or '-'} intentos "
+                  f"({format_ms(probe['time_to_success_ms'])} ms)  estable {format_ms(probe['steady_ms'])} ms")
+
+    def is_cold(probe):
+        return probe["first_status"] != 200 or (probe["cold_penalty_ms"] or 0) > penalty_threshold_ms
+
+    # Con gap 0 se mide el primer acceso tras un despliegue; el resto, el despertar tras inactividad.
+    # El intervalo más corto que ya provoca un arranque en frío marca el ritmo del keep-warm.
+    recommendations = []
+    if any(is_cold(probe) for probe in report["probes"] if probe["gap_s"] == 0):
+        recommendations.append("El primer acceso tras el despliegue es lento o falla: "
+                               "calentar el servicio después de cada despliegue")
+    cold_gaps = sorted({probe["gap_s"] for probe in report["probes"] if probe["gap_s"] > 0 and is_cold(probe)})
+    if cold_gaps:
+        warm_gaps = [gap for gap in gaps if 0 < gap < cold_gaps[0]]
+        interval = max(warm_gaps) if warm_gaps else cold_gaps[0] / 2
+        recommendations.append(f"Arranque en frío a partir de {cold_gaps[0]:g}s de inactividad: enviar un ping "
+                               f"keep-warm cada {interval:g}s o mantener más instancias activas")
+    report["recommendation"] = " | ".join(recommendations) or \
+        "No se observaron arranques en frío en los intervalos probados"
+    print(f"\n💡 {report['recommendation']}")
+
+    filename = f"api_coldstart_report_{int(time.time())}.json"
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Reporte de arranque en frío generado: {filename}")
+    return report
@@ -0,0 +1,55 @@
+"""Comparación de dos reportes guardados, endpoint por endpoint."""
+from results import endpoint_key, format_ms, iter_report_tests, summarize_latencies
+
+
+def load_endpoint_stats(path):
+    """Éxitos, fallos y latencias por endpoint de un reporte"""
+    grouped = {}
+    for test in iter_report_tests(path):
+        entry = grouped.setdefault(endpoint_key(test), {"success": 0, "failed": 0, "durations": []})
+        ok = test["success"] and test.get("status_code", 0) < 400
+        entry["success" if ok else "failed"] += 1
+        if test.get("duration_ms") is not None:
+            entry["durations"].append(test["duration_ms"])
+
+    return {
+        key: {"success": entry["success"], "failed": entry["failed"],
+              "latency_ms": summarize_latencies(entry["durations"])}
+        for key, entry in grouped.items()
+    }
+
+
+def format_delta(before, after):
+    if before is None or after is None or before == 0:
+        return "-"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def compare_reports(baseline_path, candidate_path):
+    baseline = load_endpoint_stats(baseline_path)
+    candidate = load_endpoint_stats(candidate_path)
+
+    print(f"Referencia: {baseline_path}")
+    print(f"Candidato:  {candidate_path}\n")
+    print(f"{'ENDPOINT':<50} {'OK A':>5} {'OK B':>5} {'P50 A':>7} {'P50 B':>7} {'Δ P50':>7} {'P95 A':>7} {'P95 B':>7} {'Δ P95':>7}")
+
+    comparison = {}
+    for key in sorted(set(baseline) | set(candidate)):
+        a = baseline.get(key)
+        b = candidate.get(key)
+        a_lat = a["latency_ms"] if a else {}
+        b_lat = b["latency_ms"] if b else {}
+        ok_a = f"{a['success']}/{a['success'] + a['failed']}" if a else "-"
+        ok_b = f"{b['success']}/{b['success'] + b['failed']}" if b else "-"
+        print(f"{key:<50} {ok_a:>5} {ok_b:>5} "
+              f"{format_ms(a_lat.get('p50')):>7} {format_ms(b_lat.get('p50')):>7} "
+              f"{format_delta(a_lat.get('p50'), b_lat.get('p50')):>7} "
+              f"{format_ms(a_lat.get('p95')):>7} {format_ms(b_lat.get('p95')):>7} "
+              f"{format_delta(a_lat.get('p95'), b_lat.get('p95')):>7}")
+
+        # Endpoints que pasan de funcionar a fallar
+        if a and b and a["failed"] == 0 and b["failed"] > 0:
+            print(f"  ⚠️ Regresión: {key} falla en el candidato")
+        comparison[key] = {"baseline": a, "candidate": b}
+
+    return comparison
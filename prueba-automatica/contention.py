@@ -0,0 +1,209 @@
+"""Benchmark de contención de escrituras sobre sitios compartidos.
+
+K clientes (todos con el token del mismo propietario) actualizan un conjunto de
+sitios con solapamiento alto o bajo mediante PUT /api/sites/:id, alternando el
+nombre y la URL. Al terminar se lee cada sitio y se comprueba, campo a campo,
+que el valor final proviene de una escritura que pudo ser la última; si no, se
+cuenta como actualización perdida.
+
+Opcionalmente una fracción de las escrituras va a PUT /api/monitor/site/:id/settings.
+Hoy esa ruta responde 500 (monitorService.updateMonitorSettings no existe) y
+GET /api/sites/:id no devuelve monitorSettings, así que esas escrituras solo
+aportan rendimiento, latencia y errores; por defecto no se envían.
+"""
+import json
+import random
+import threading
+import time
+
+from load_runner import create_worker, silenced
+from results import format_ms, summarize_latencies
+
+OVERLAP_PRESETS = {"high": 1.0, "low": 0.0}
+
+# Respuestas que indican un conflicto de escritura o saturación del backend
+CONFLICT_STATUSES = {409, 412, 429}
+
+# Campos de PUT /api/sites/:id que devuelve GET /api/sites/:id y se verifican al final
+SITE_FIELDS = ("name", "url")
+
+SITE_URL = "https://portafolio-six-sigma-45.vercel.app/"
+
+
+def parse_overlap(value):
+    if value in OVERLAP_PRESETS:
+        return OVERLAP_PRESETS[value]
+    overlap = float(value)
+    if not 0 <= overlap <= 1:
+        raise ValueError("El solapamiento debe ser high, low o un valor entre 0 y 1")
+    return overlap
+
+
+def create_site_pool(owner, size):
+    """Crea los sitios compartidos; las URLs deben ser distintas para el backend"""
+    sites = []
+    for index in range(size):
+        owner.create_site(url=f"{SITE_URL}?contention={index}")
+        if not owner.site_id or owner.site_id in sites:
+            raise RuntimeError(f"No se pudo crear el sitio {index + 1} del conjunto compartido")
+        sites.append(owner.site_id)
+    return sites
+
+
+def write_worker(tester, index, sites, overlap, settings_ratio, deadline, writes, seed):
+    rng = random.Random(seed + index)
+    home = sites[index % len(sites)]
+    sequence = 0
+    while time.monotonic() < deadline:
+        site_id = rng.choice(sites) if rng.random() < overlap else home
+        sequence += 1
+        if rng.random() < settings_ratio:
+            op = "settings"
+            value = index * 1_000_000 + sequence
+            endpoint = f"/api/monitor/site/{site_id}/settings"
+            payload = {"alertThreshold": value}
+        else:
+            # Valores únicos por escritura para saber cuál quedó como estado final
+            op = rng.choice(SITE_FIELDS)
+            value = f"ct-{index}-{sequence}" if op == "name" else f"{SITE_URL}?contention={index}-{sequence}"
+            endpoint = f"/api/sites/{site_id}"
+            payload = {op: value}
+
+        start = time.monotonic()
+        try:
+            status = tester.send_request("PUT", endpoint, payload).status_code
+        except Exception:
+            status = "error"
+        end = time.monotonic()
+        writes.append({"site": site_id, "op": op, "value": value, "status": status,
+                       "start": start, "end": end, "ms": (end - start) * 1000})
+
+
+def acknowledged(write):
+    return write["status"] != "error" and 200 <= write["status"] < 300
+
+
+def check_lost_updates(writes, final_sites, fields=SITE_FIELDS):
+    """Clasifica el valor final de cada campo de cada sitio frente a las escrituras realizadas.
+
+    Una escritura confirmada pudo ser la última si ninguna otra empezó después
+    de que terminara. Si el valor final es de una escritura anterior a esas,
+    una actualización confirmada se perdió.
+    """
+    outcome = {}
+    for field in fields:
+        result = outcome[field] = {"verified": 0, "lost": 0, "applied_despite_error": 0, "unknown": 0,
+                                   "sites": {}}
+        for site_id, site in final_sites.items():
+            field_writes = [write for write in writes if write["site"] == site_id and write["op"] == field]
+            acked = [write for write in field_writes if acknowledged(write)]
+            if not acked:
+                continue
+            final = site.get(field)
+            last_start = max(write["start"] for write in acked)
+            candidates = {write["value"] for write in acked if write["end"] >= last_start}
+
+            if final in candidates:
+                verdict = "verified"
+            elif any(write["value"] == final for write in acked):
+                verdict = "lost"
+            elif any(write["value"] == final for write in field_writes):
+                verdict = "applied_despite_error"
+            else:
+                verdict = "unknown"
+            result[verdict] += 1
+            result["sites"][site_id] = {"final": final, "verdict": verdict, "acked_writes": len(acked)}
+    return outcome
+
+
+def summarize_writes(writes, elapsed):
+    summary = {}
+    for op in SITE_FIELDS + ("settings",):
+        selected = [write for write in writes if write["op"] == op]
+        if not selected and op == "settings":
+            continue
+        status_codes = {}
+        for write in selected:
+            status_codes[str(write["status"])] = status_codes.get(str(write["status"]), 0) + 1
+        acked = sum(1 for write in selected if acknowledged(write))
+        summary[op] = {
+            "requests": len(selected),
+            "acked": acked,
+            "throughput_wps": round(acked / elapsed, 2) if elapsed else None,
+            "conflicts": sum(1 for write in selected if write["status"] in CONFLICT_STATUSES),
+            "errors": len(selected) - acked,
+            "status_codes": status_codes,
+            "latency_ms": summarize_latencies([write["ms"] for write in selected]),
+        }
+    return summary
+
+
+def run_round(base_url, token, sites, workers, overlap, duration, settings_ratio, seed):
+    stamp = int(time.time())
+    testers = []
+    for index in range(workers):
+        tester = create_worker(base_url, f"contention_{stamp}_{index}@example.com")
+        tester.token = token
+        testers.append(tester)
+
+    writes = []
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=write_worker, daemon=True,
+                                args=(tester, index, sites, overlap, settings_ratio, deadline, writes, seed))
+               for index, tester in enumerate(testers)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    # Lectura posterior, sin tráfico concurrente
+    final_sites = {}
+    reader = testers[0]
+    for site_id in sites:
+        response = reader.send_request("GET", f"/api/sites/{site_id}")
+        if response.status_code == 200:
+            final_sites[site_id] = (response.json().get("data") or {}).get("site") or {}
+
+    return {
+        "workers": workers,
+        "duration_s": round(elapsed, 2),
+        "writes": summarize_writes(writes, elapsed),
+        "lost_updates": check_lost_updates(writes, final_sites),
+    }
+
+
+def run_contention(base_url, worker_counts=(1, 4, 16), overlap="high", pool=None, duration=30,
+                   settings_ratio=0.0, seed=1):
+    overlap_value = parse_overlap(overlap)
+    if pool is None:
+        # Solapamiento alto: todos sobre un único sitio; bajo: un sitio por cliente
+        pool = 1 if overlap_value == 1.0 else max(worker_counts)
+
+    owner = create_worker(base_url, f"contention_owner_{int(time.time())}@example.com")
+    print(f"Preparando {pool} sitios compartidos en {base_url}...")
+    with silenced():
+        owner.register_user()
+        sites = create_site_pool(owner, pool)
+
+    report = {"base_url": base_url, "overlap": overlap_value, "pool": pool,
+              "settings_ratio": settings_ratio, "rounds": []}
+    print(f"\n{'CLIENTES':>8} {'OP':<9} {'ESCR/S':>7} {'OK':>6} {'CONFL':>6} {'ERR':>5} "
+          f"{'P50':>6} {'P95':>6} {'P99':>6}   PERDIDAS")
+    for workers in worker_counts:
+        result = run_round(base_url, owner.token, sites, workers, overlap_value, duration, settings_ratio, seed)
+        report["rounds"].append(result)
+        for op, entry in result["writes"].items():
+            latency = entry["latency_ms"]
+            lost = result["lost_updates"].get(op)
+            lost_column = f"{lost['lost']}/{lost['verified'] + lost['lost'] + lost['unknown']}" if lost else ""
+            print(f"{workers:>8} {op:<9} {entry['throughput_wps'] or 0:>7.2f} {entry['acked']:>6} "
+                  f"{entry['conflicts']:>6} {entry['errors']:>5} {format_ms(latency['p50']):>6} "
+                  f"{format_ms(latency['p95']):>6} {format_ms(latency['p99']):>6}   {lost_column}")
+
+    filename = f"api_contention_report_{int(time.time())}.json"
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Reporte de contención generado: {filename}")
+    return report
@@ -0,0 +1,14 @@
+// Exporta la especificación OpenAPI generada por src/config/swagger.js a un fichero JSON
+// para validar respuestas sin depender del servidor:
+//   node prueba-automatica/export_openapi.js [salida.json]
+const fs = require('fs');
+const path = require('path');
+
+// swagger-jsdoc resuelve las rutas de 'apis' respecto al directorio actual
+process.chdir(path.join(__dirname, '..'));
+
+const { swaggerSpec } = require('../src/config/swagger');
+
+const output = path.resolve(__dirname, process.argv[2] || 'openapi.json');
+fs.writeFileSync(output, JSON.stringify(swaggerSpec, null, 2));
+console.log(`Especificación OpenAPI exportada en ${output}`);
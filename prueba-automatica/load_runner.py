@@ -0,0 +1,139 @@
+"""Modo carga: varios usuarios ejecutan los pasos del plan en bucle y sin pausas."""
+import contextlib
+import json
+import os
+import threading
+import time
+
+from results import endpoint_key, format_ms, summarize_latencies
+from test_api import ApiTester
+
+
+def create_worker(base_url, email, metrics=None, validator=None):
+    """Probador para medir: sin cuerpos en los resultados y sin reintentos"""
+    tester = ApiTester(base_url)
+    tester.email = email
+    tester.metrics = metrics
+    tester.schema_validator = validator
+    tester.keep_bodies = False
+    # Los reintentos con espera falsearían las latencias medidas
+    tester.max_retries = 1
+    return tester
+
+
+def create_workers(base_url, workers, metrics=None, prefix="load", validator=None):
+    """Crea un probador por usuario; cada uno tiene su propia cuenta y sesión HTTP.
+
+    Todos comparten el mismo validador de esquemas, compilado una sola vez.
+    """
+    stamp = int(time.time())
+    return [create_worker(base_url, f"{prefix}_{stamp}_{index}@example.com", metrics, validator)
+            for index in range(workers)]
+
+
+@contextlib.contextmanager
+def silenced():
+    """Los pasos imprimen su progreso; al medir esa salida solo añade ruido"""
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        yield
+
+
+def run_step(tester, name):
+    """Ejecuta un paso registrando como fallo cualquier excepción no controlada"""
+    try:
+        getattr(tester, name)()
+    except Exception as e:
+        tester.add_result(name, "ERROR", None, str(e), False, "Excepción no controlada")
+
+
+def summarize_tests(tests, elapsed=None):
+    """Agrupa resultados por endpoint: solicitudes, errores, rps y percentiles.
+
+    Las rps solo se calculan con elapsed (la duración de una fase concurrente);
+    sin él, solicitudes / latencia acumulada sería 1000 / latencia media, no rendimiento.
+    """
+    grouped = {}
+    for test in tests:
+        entry = grouped.setdefault(endpoint_key(test), {"durations": [], "errors": 0, "schema_errors": 0,
+                                                        "status_codes": {}})
+        if test.get("duration_ms") is not None:
+            entry["durations"].append(test["duration_ms"])
+        if not test["success"] or test.get("status_code", 0) >= 400:
+            entry["errors"] += 1
+        if test.get("schema_errors"):
+            entry["schema_errors"] += 1
+        status = str(test.get("status_code", "error"))
+        entry["status_codes"][status] = entry["status_codes"].get(status, 0) + 1
+
+    summary = {}
+    for key, entry in sorted(grouped.items()):
+        requests_count = sum(entry["status_codes"].values())
+        summary[key] = {
+            "requests": requests_count,
+            "errors": entry["errors"],
+            "schema_errors": entry["schema_errors"],
+            # Sin la duración de una fase concurrente no hay un rendimiento que medir
+            "rps": round(requests_count / elapsed, 2) if elapsed else None,
+            "status_codes": entry["status_codes"],
+            "latency_ms": summarize_latencies(entry["durations"]),
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n{'ENDPOINT':<50} {'REQ':>6} {'ERR':>5} {'RPS':>7} {'P50':>6} {'P95':>6} {'P99':>6} {'MAX':>6}")
+    for key, entry in summary.items():
+        latency = entry["latency_ms"]
+        print(f"{key:<50} {entry['requests']:>6} {entry['errors']:>5} {entry['rps'] or 0:>7.2f} "
+              f"{format_ms(latency['p50']):>6} {format_ms(latency['p95']):>6} "
+              f"{format_ms(latency['p99']):>6} {format_ms(latency['max']):>6}")
+
+
+def run_load(base_url, only=None, workers=4, duration=60, metrics=None, validator=None):
+    testers = create_workers(base_url, workers, metrics, validator=validator)
+    plan = testers[0].select_plan(only)
+    setup_steps = [name for name, _, setup in plan if setup]
+    loop_steps = [name for name, _, setup in plan if not setup] or setup_steps
+
+    print(f"Preparando {workers} usuarios contra {base_url}...")
+    offsets = {}
+    with silenced():
+        for tester in testers:
+            for name in setup_steps:
+                run_step(tester, name)
+            offsets[id(tester)] = len(tester.results["tests"])
+
+        deadline = time.monotonic() + duration
+
+        def worker(tester):
+            while time.monotonic() < deadline:
+                for name in loop_steps:
+                    if time.monotonic() >= deadline:
+                        break
+                    run_step(tester, name)
+
+        threads = [threading.Thread(target=worker, args=(tester,), daemon=True) for tester in testers]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+    tests = [test for tester in testers for test in tester.results["tests"][offsets[id(tester)]:]]
+    summary = summarize_tests(tests, elapsed)
+    print_summary(summary)
+
+    report = {
+        "timestamp": testers[0].results["timestamp"],
+        "base_url": base_url,
+        "workers": workers,
+        "duration_s": round(elapsed, 2),
+        "steps": loop_steps,
+        "endpoints": summary,
+    }
+    filename = f"api_load_report_{int(time.time())}.json"
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Reporte de carga generado: {filename}")
+    return report
@@ -0,0 +1,120 @@
+"""Métricas en vivo del probador de la API en formato Prometheus/OpenMetrics.
+
+El registro se actualiza en cada solicitud con operaciones O(1) bajo un único
+lock, y solo se serializa cuando Prometheus consulta /metrics.
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites superiores (segundos) de los buckets del histograma de latencia
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class MetricsRegistry:
+    """Contadores, gauges e histogramas etiquetados por endpoint, método y estado"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="api_tester"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests = {}    # (endpoint, method, status) -> total
+        self._in_flight = {}   # (endpoint, method) -> solicitudes en curso
+        self._histograms = {}  # (endpoint, method, status) -> [cuenta por bucket..., +Inf, suma]
+
+    def request_started(self, endpoint, method):
+        key = (endpoint, method)
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def request_finished(self, endpoint, method, status, seconds):
+        """Registra el final de una solicitud; status es el código HTTP o 'error'"""
+        key = (endpoint, method, str(status))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._in_flight[(endpoint, method)] -= 1
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            histogram[index] += 1
+            histogram[-1] += seconds
+
+    def render(self):
+        """Serializa el registro en el formato de exposición de texto de Prometheus"""
+        with self._lock:
+            requests = dict(self._requests)
+            in_flight = dict(self._in_flight)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+
+        name = f"{self.prefix}_requests_total"
+        lines = [
+            f"# HELP {name} Solicitudes HTTP completadas por el probador.",
+            f"# TYPE {name} counter",
+        ]
+        for key, total in sorted(requests.items()):
+            lines.append(f"{name}{{{_labels(('endpoint', 'method', 'status'), key)}}} {total}")
+
+        name = f"{self.prefix}_requests_in_flight"
+        lines += [
+            f"# HELP {name} Solicitudes HTTP en curso.",
+            f"# TYPE {name} gauge",
+        ]
+        for key, current in sorted(in_flight.items()):
+            lines.append(f"{name}{{{_labels(('endpoint', 'method'), key)}}} {current}")
+
+        name = f"{self.prefix}_request_duration_seconds"
+        lines += [
+            f"# HELP {name} Latencia de las solicitudes HTTP en segundos.",
+            f"# TYPE {name} histogram",
+        ]
+        bounds = self.buckets + (float("inf"),)
+        for key, histogram in sorted(histograms.items()):
+            labels = _labels(("endpoint", "method", "status"), key)
+            cumulative = 0
+            for bound, count in zip(bounds, histogram):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram[-1]}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(registry, port, host="127.0.0.1"):
+    """Sirve /metrics en un hilo en segundo plano y devuelve el servidor"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Los scrapes periódicos no deben ensuciar la salida de las pruebas
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
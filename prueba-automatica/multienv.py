@@ -0,0 +1,146 @@
+"""Comparación en paralelo de varios entornos (staging, producción, builds nuevas).
+
+Los usuarios de todos los entornos repiten los pasos a la vez durante fases de
+duración fija, como en el modo carga, y el orden de arranque de los hilos rota
+en cada fase, de modo que ninguno se beneficia sistemáticamente de unas
+condiciones de red distintas. Con la duración de las fases, el rendimiento es
+solicitudes / tiempo transcurrido por entorno y endpoint.
+"""
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+from load_runner import create_worker, run_step, silenced, summarize_tests
+from results import format_ms
+
+
+def parse_envs(values):
+    """Convierte 'nombre=url' (o solo 'url') en una lista de (nombre, url)"""
+    envs = []
+    for value in values:
+        name, sep, url = value.partition("=")
+        if not sep:
+            name, url = urlparse(value).netloc or value, value
+        envs.append((name, url.rstrip("/")))
+    names = [name for name, _ in envs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nombres de entorno repetidos: {', '.join(names)}")
+    return envs
+
+
+def run_interleaved(testers, name):
+    """Lanza el mismo paso en todos los entornos a la vez"""
+    threads = [threading.Thread(target=run_step, args=(tester, name), daemon=True) for tester in testers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_phase(groups, steps, seconds):
+    """Todos los usuarios de todos los entornos repiten los pasos a la vez durante seconds.
+
+    Devuelve el tiempo transcurrido, común a todos los entornos.
+    """
+    started = time.monotonic()
+    deadline = started + seconds
+
+    def worker(tester):
+        while time.monotonic() < deadline:
+            for name in steps:
+                if time.monotonic() >= deadline:
+                    break
+                run_step(tester, name)
+
+    threads = [threading.Thread(target=worker, args=(tester,), daemon=True)
+               for testers in groups for tester in testers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - started
+
+
+def compare_environments(env_values, only=None, rounds=3, duration=30, workers=1):
+    envs = parse_envs(env_values)
+    if len(envs) < 2:
+        raise ValueError("Se necesitan al menos dos entornos para comparar")
+
+    stamp = int(time.time())
+    groups = [[create_worker(url, f"envcmp_{stamp}_{index}_{worker}@example.com") for worker in range(workers)]
+              for index, (_, url) in enumerate(envs)]
+    plan = groups[0][0].select_plan(only)
+    setup_steps = [name for name, _, setup in plan if setup]
+    loop_steps = [name for name, _, setup in plan if not setup] or setup_steps
+
+    print(f"Comparando {len(envs)} entornos ({workers} usuarios cada uno) durante {duration:g}s "
+          f"en {rounds} fases:")
+    for name, url in envs:
+        print(f"  - {name}: {url}")
+
+    testers = [tester for group in groups for tester in group]
+    with silenced():
+        for step in setup_steps:
+            run_interleaved(testers, step)
+        offsets = {id(tester): len(tester.results["tests"]) for tester in testers}
+
+        elapsed = 0.0
+        for phase in range(rounds):
+            # Rotar el orden de arranque de los hilos en cada fase
+            shift = phase % len(groups)
+            elapsed += run_phase(groups[shift:] + groups[:shift], loop_steps, duration / rounds)
+
+    summaries = {}
+    for (name, _), group in zip(envs, groups):
+        tests = [test for tester in group for test in tester.results["tests"][offsets[id(tester)]:]]
+        summaries[name] = summarize_tests(tests, elapsed)
+    print_side_by_side(summaries)
+
+    report = {
+        "timestamp": testers[0].results["timestamp"],
+        "environments": dict(envs),
+        "rounds": rounds,
+        "workers": workers,
+        "duration_s": round(elapsed, 2),
+        "steps": loop_steps,
+        "endpoints": summaries,
+    }
+    filename = f"api_env_comparison_{int(time.time())}.json"
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Comparación generada: {filename}")
+    return report
+
+
+def print_side_by_side(summaries):
+    names = list(summaries)
+    reference = names[0]
+    endpoints = sorted({key for summary in summaries.values() for key in summary})
+
+    header = f"{'ENDPOINT':<45}"
+    for name in names:
+        header += f" | {name[:28]:^28}"
+    print("\n" + header)
+    print(f"{'':<45}" + f" | {'P50':>5} {'P95':>5} {'P99':>5} {'RPS':>6} {'ERR':>3}" * len(names))
+
+    for key in endpoints:
+        line = f"{key:<45}"
+        for name in names:
+            entry = summaries[name].get(key)
+            if not entry:
+                line += f" | {'-':^28}"
+                continue
+            latency = entry["latency_ms"]
+            line += (f" | {format_ms(latency['p50']):>5} {format_ms(latency['p95']):>5} "
+                     f"{format_ms(latency['p99']):>5} {entry['rps'] or 0:>6.1f} {entry['errors']:>3}")
+        print(line)
+
+        base = summaries[reference].get(key)
+        for name in names[1:]:
+            other = summaries[name].get(key)
+            if base and other and base["latency_ms"]["p50"] and other["latency_ms"]["p50"]:
+                change = (other["latency_ms"]["p50"] - base["latency_ms"]["p50"]) / base["latency_ms"]["p50"] * 100
+                if abs(change) >= 20:
+                    print(f"  {'⚠️' if change > 0 else '⬇️'} {name}: p50 {change:+.0f}% respecto a {reference}")
+
@@ -0,0 +1,311 @@
+"""Caracterización de límites de tasa y throttling por grupo de rutas.
+
+Para cada grupo se envían solicitudes a tasa creciente (bucle abierto: la tasa
+no baja aunque el servidor tarde más) con dos alcances:
+
+- token: todas las solicitudes con el mismo token;
+- ip: las solicitudes se reparten entre varios usuarios, de modo que solo un
+  límite por IP (o global) puede dispararse.
+
+Cada escalón registra los 429, las cabeceras Retry-After / RateLimit-* y los
+percentiles de latencia. El ramp de un grupo se detiene en el primer escalón
+limitado (429, precipicio de latencia o errores), que es el que se reporta.
+
+Los escalones se acumulan en la ventana del limitador: con una cuota de ventana
+fija (express-rate-limit, p. ej. 100 solicitudes cada 10 minutos en /api/logs)
+el primer 429 depende del total enviado, no de la tasa. Por eso se registran
+las solicitudes enviadas y el tiempo transcurrido hasta el primer 429, y el
+límite se expresa como N por ventana; solo se da en solicitudes/s cuando la
+ventana es más corta que un escalón, es decir, cuando de verdad es una tasa.
+"""
+import re
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from results import format_ms, summarize_latencies
+from test_api import ApiTester
+
+# Grupo de rutas -> (método, endpoint representativo). Solo lecturas baratas:
+# los chequeos de monitoreo completos consultan sitios externos y falsearían la medida.
+ROUTE_GROUPS = {
+    "health": ("GET", "/health"),
+    "auth": ("GET", "/api/auth/me"),
+    "sites": ("GET", "/api/sites"),
+    "logs": ("GET", "/api/logs"),
+    "stats": ("GET", "/api/stats"),
+    "monitor": ("GET", "/api/monitor/site/{site_id}/history"),
+}
+
+PUBLIC_GROUPS = {"health"}
+
+DEFAULT_RATES = (1, 2, 5, 10, 20, 50)
+
+# Cabeceras de límite de tasa (estándar de express-rate-limit y variantes X-)
+RATE_LIMIT_HEADERS = ("RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy",
+                      "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset")
+
+
+class RateProbe:
+    """Envía solicitudes a un endpoint rotando entre tokens, con una sesión por hilo"""
+
+    def __init__(self, base_url, method, endpoint, tokens, timeout=20):
+        self.base_url = base_url
+        self.method = method
+        self.endpoint = endpoint
+        self.tokens = tokens
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _tester(self, token):
+        testers = self._local.__dict__.setdefault("testers", {})
+        if token not in testers:
+            tester = ApiTester(self.base_url)
+            tester.token = token
+            testers[token] = tester
+        return testers[token]
+
+    def send(self, index):
+        tester = self._tester(self.tokens[index % len(self.tokens)])
+        start = time.perf_counter()
+        try:
+            response = tester.send_request(self.method, self.endpoint, timeout=self.timeout)
+        except Exception as e:
+            return {"status": "error", "sent_at": start, "ms": (time.perf_counter() - start) * 1000,
+                    "error": str(e)}
+
+        sample = {"status": response.status_code, "sent_at": start, "ms": (time.perf_counter() - start) * 1000}
+        if response.headers.get("Retry-After"):
+            sample["retry_after"] = response.headers["Retry-After"]
+        for header in RATE_LIMIT_HEADERS:
+            if header in response.headers:
+                sample.setdefault("rate_limit_headers", {})[header] = response.headers[header]
+        return sample
+
+
+def run_level(probe, rate, seconds, max_workers, origin=None):
+    """Ejecuta un escalón a tasa fija y resume lo observado.
+
+    origin es el inicio del ramp: el primer 429 se sitúa respecto a él.
+    """
+    total = max(1, int(round(rate * seconds)))
+    interval = 1.0 / rate
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        start = time.perf_counter()
+        for index in range(total):
+            delay = start + index * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(probe.send, index))
+        samples = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    status_codes = {}
+    for sample in samples:
+        status_codes[str(sample["status"])] = status_codes.get(str(sample["status"]), 0) + 1
+
+    level = {
+        "offered_rps": rate,
+        "achieved_rps": round(len(samples) / elapsed, 2),
+        "requests": len(samples),
+        "status_codes": status_codes,
+        "throttled": status_codes.get("429", 0),
+        "errors": sum(count for status, count in status_codes.items()
+                      if status == "error" or (status != "429" and int(status) >= 500)),
+        "latency_ms": summarize_latencies([sample["ms"] for sample in samples if sample["status"] != "error"]),
+    }
+    retry_after = [sample["retry_after"] for sample in samples if "retry_after" in sample]
+    if retry_after:
+        level["retry_after"] = sorted(set(retry_after))
+    headers = [sample["rate_limit_headers"] for sample in samples if "rate_limit_headers" in sample]
+    if headers:
+        level["rate_limit_headers"] = headers[-1]
+
+    # Las muestras están en orden de envío: el índice del primer 429 es lo que se envió antes
+    first = next((index for index, sample in enumerate(samples) if sample["status"] == 429), None)
+    if first is not None:
+        sample = samples[first]
+        level["first_throttled"] = {
+            "index": first,
+            "at_s": round(sample["sent_at"] - (start if origin is None else origin), 2),
+            "rate_limit_headers": sample.get("rate_limit_headers", {}),
+        }
+    return level
+
+
+def header_value(headers, name):
+    """Valor entero de RateLimit-<name> (o X-RateLimit-<name>), o None"""
+    for key in (f"RateLimit-{name}", f"X-RateLimit-{name}"):
+        value = (headers or {}).get(key, "")
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+def describe_limit(requests_before, elapsed_s, headers, step_seconds):
+    """Describe un límite que devolvió 429: cuota por ventana o, si la ventana es corta, una tasa.
+
+    La ventana sale de RateLimit-Policy (w=) o, si no está, del tiempo hasta el
+    primer 429 más RateLimit-Reset. Sin cabeceras se desconoce la ventana y
+    solo se informa de lo enviado antes del primer 429.
+    """
+    limit = header_value(headers, "Limit")
+    window = None
+    policy = re.search(r"w=(\d+)", (headers or {}).get("RateLimit-Policy", ""))
+    if policy:
+        window = int(policy.group(1))
+    else:
+        reset = header_value(headers, "Reset")
+        if reset is not None:
+            # Las cabeceras X- heredadas dan la hora de reinicio en segundos epoch
+            if reset > 1_000_000_000:
+                reset = max(0, reset - int(time.time()))
+            window = round(elapsed_s + reset)
+
+    quota = {
+        "limit": limit if limit is not None else requests_before,
+        "limit_source": "headers" if limit is not None else "observed",
+        "window_s": window,
+        "requests_before_limit": requests_before,
+        "elapsed_s": round(elapsed_s, 2),
+        "kind": "rate" if window and window <= step_seconds else "window",
+    }
+    if quota["kind"] == "rate":
+        quota["limit_rps"] = round(quota["limit"] / window, 2)
+    return quota
+
+
+def format_quota(quota):
+    if quota is None:
+        return "-"
+    if quota["kind"] == "rate":
+        return f"{quota['limit_rps']:g} rps"
+    window = f"{quota['window_s']}s" if quota["window_s"] else "ventana ?"
+    prefix = "" if quota["limit_source"] == "headers" else "~"
+    return f"{prefix}{quota['limit']}/{window}"
+
+
+def limiting_reason(level, baseline, cliff_factor, error_ratio):
+    """Motivo por el que un escalón se considera limitado, o None"""
+    if level["throttled"]:
+        return "429"
+    if level["errors"] / level["requests"] > error_ratio:
+        return "errores"
+    p95 = level["latency_ms"]["p95"]
+    if baseline and p95 is not None and p95 > baseline * cliff_factor:
+        return "latencia"
+    return None
+
+
+def ramp(probe, rates, seconds, max_workers, cliff_factor, error_ratio, cooldown):
+    levels = []
+    baseline = None
+    sent = 0
+    quota = None
+    origin = time.perf_counter()
+    for rate in rates:
+        level = run_level(probe, rate, seconds, max_workers, origin=origin)
+        levels.append(level)
+        if baseline is None:
+            baseline = level["latency_ms"]["p95"]
+
+        reason = limiting_reason(level, baseline, cliff_factor, error_ratio)
+        print(f"    {rate:>6} rps → {level['achieved_rps']:>7} rps  429: {level['throttled']:>4}  "
+              f"errores: {level['errors']:>4}  p95 {format_ms(level['latency_ms']['p95']):>6} ms"
+              f"{'  ⚠️ ' + reason if reason else ''}")
+        if "first_throttled" in level:
+            first = level["first_throttled"]
+            quota = describe_limit(sent + first["index"], first["at_s"],
+                                   first["rate_limit_headers"] or level.get("rate_limit_headers"), seconds)
+            print(f"           primer 429 tras {quota['requests_before_limit']} solicitudes en "
+                  f"{quota['elapsed_s']:g}s → límite {format_quota(quota)}")
+        sent += level["requests"]
+        if reason:
+            level["limited_by"] = reason
+            break
+
+    # Esperar a que la ventana del limitador se libere antes de seguir midiendo
+    wait = cooldown
+    for value in levels[-1].get("retry_after", []):
+        if value.isdigit():
+            wait = max(wait, int(value))
+    if wait:
+        time.sleep(wait)
+
+    clean = [level["offered_rps"] for level in levels if "limited_by" not in level]
+    limited = levels[-1] if "limited_by" in levels[-1] else None
+    # Con una cuota de ventana fija la tasa del escalón en que se agota no significa nada
+    per_window = quota is not None and quota["kind"] == "window"
+    return {
+        "max_clean_rps": max(clean) if clean and not per_window else None,
+        "limited_at_rps": limited["offered_rps"] if limited and not per_window else None,
+        "limited_by": limited["limited_by"] if limited else None,
+        "quota": quota,
+        "retry_after": limited.get("retry_after") if limited else None,
+        "rate_limit_headers": next((level["rate_limit_headers"] for level in reversed(levels)
+                                    if "rate_limit_headers" in level), None),
+        "levels": levels,
+    }
+
+
+def create_identity(base_url, index, with_site=False):
+    tester = ApiTester(base_url)
+    tester.email = f"ratelimit_{int(time.time())}_{index}@example.com"
+    tester.register_user()
+    if with_site:
+        tester.create_site()
+    return tester
+
+
+def characterize_rate_limits(base_url, groups=None, rates=DEFAULT_RATES, seconds=10, ip_users=5,
+                             max_workers=32, cliff_factor=3.0, error_ratio=0.05, cooldown=5):
+    groups = groups or list(ROUTE_GROUPS)
+    unknown = [group for group in groups if group not in ROUTE_GROUPS]
+    if unknown:
+        raise ValueError(f"Grupos desconocidos: {', '.join(unknown)}")
+
+    print(f"Preparando {ip_users} usuarios contra {base_url}...")
+    owner = create_identity(base_url, 0, with_site="monitor" in groups)
+    others = [create_identity(base_url, index) for index in range(1, ip_users)]
+
+    report = {"base_url": base_url, "timestamp": owner.results["timestamp"], "rates": list(rates),
+              "step_seconds": seconds, "ip_users": ip_users, "groups": {}}
+
+    for group in groups:
+        method, endpoint = ROUTE_GROUPS[group]
+        endpoint = endpoint.format(site_id=owner.site_id)
+        scopes = {"ip": [None]} if group in PUBLIC_GROUPS else {
+            "token": [owner.token],
+            "ip": [owner.token] + [tester.token for tester in others],
+        }
+        report["groups"][group] = {"endpoint": f"{method} {ROUTE_GROUPS[group][1]}", "scopes": {}}
+        for scope, tokens in scopes.items():
+            print(f"\n  {group} ({scope}, {len(tokens)} tokens): {method} {endpoint}")
+            probe = RateProbe(base_url, method, endpoint, tokens)
+            report["groups"][group]["scopes"][scope] = ramp(
+                probe, rates, seconds, max_workers, cliff_factor, error_ratio, cooldown)
+
+    print_rate_limit_map(report)
+    filename = f"api_ratelimit_report_{int(time.time())}.json"
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Mapa de límites generado: {filename}")
+    return report
+
+
+def print_rate_limit_map(report):
+    print(f"\n{'GRUPO':<10} {'ALCANCE':<7} {'RPS OK':>7} {'LÍMITE':>12} {'MOTIVO':<9} "
+          f"{'ANTES DEL 429':<16} RETRY-AFTER")
+    for group, entry in report["groups"].items():
+        for scope, result in entry["scopes"].items():
+            quota = result["quota"]
+            if quota:
+                limit = format_quota(quota)
+                before = f"{quota['requests_before_limit']} en {quota['elapsed_s']:g}s"
+            else:
+                limit = f"{result['limited_at_rps']} rps" if result["limited_at_rps"] else "-"
+                before = "-"
+            print(f"{group:<10} {scope:<7} {result['max_clean_rps'] or '-':>7} {limit:>12} "
+                  f"{result['limited_by'] or '-':<9} {before:<16} {','.join(result['retry_after'] or []) or '-'}")
@@ -0,0 +1,73 @@
+"""Repetición de las solicitudes registradas en un reporte guardado.
+
+Las credenciales y el ID del sitio del reporte original se sustituyen por los
+de una cuenta nueva, porque los originales pueden haber caducado o borrarse.
+"""
+import datetime
+import time
+
+from results import iter_report_tests
+
+HTTP_METHODS = ("GET", "POST", "PUT", "DELETE")
+
+
+def find_original_site_id(tests):
+    for test in tests:
+        if test["method"] == "POST" and test["endpoint"] == "/api/sites":
+            # En el camino de error add_result guarda el mensaje de la excepción como respuesta
+            response = test.get("response")
+            if not isinstance(response, dict):
+                continue
+            site_id = ((response.get("data") or {}).get("site") or {}).get("id")
+            if site_id:
+                return site_id
+    return None
+
+
+def replay_report(tester, path, keep_timing=False):
+    tests = [test for test in iter_report_tests(path) if test["method"] in HTTP_METHODS]
+    original_site_id = find_original_site_id(tests)
+    print(f"Repitiendo {len(tests)} solicitudes de {path} contra {tester.base_url}\n")
+
+    previous = None
+    for test in tests:
+        timestamp = datetime.datetime.fromisoformat(test["timestamp"])
+        if keep_timing and previous is not None:
+            time.sleep(max(0.0, (timestamp - previous).total_seconds()))
+        previous = timestamp
+
+        endpoint = test["endpoint"]
+        if original_site_id and tester.site_id:
+            endpoint = endpoint.replace(original_site_id, tester.site_id)
+
+        payload = test.get("payload")
+        if endpoint.startswith("/api/auth/") and isinstance(payload, dict):
+            payload = dict(payload, email=tester.email, password=tester.password)
+
+        try:
+            response = tester.send_request(test["method"], endpoint, payload)
+        except Exception as e:
+            tester.add_result(endpoint, test["method"], payload, str(e), False, "Error en la solicitud")
+            print(f"  ❌ {test['method']} {endpoint}: {str(e)}")
+            continue
+
+        tester.add_result(endpoint, test["method"], payload, response)
+        marker = "✅" if response.status_code == test.get("status_code", response.status_code) else "⚠️"
+        print(f"  {marker} {test['method']} {endpoint}: {response.status_code} "
+              f"(original: {test.get('status_code', '-')})")
+
+        # Capturar el token y el sitio nuevos para las solicitudes siguientes
+        if response.status_code in (200, 201) and test["method"] == "POST":
+            try:
+                body = response.json()
+            except ValueError:
+                continue
+            data = (body.get("data") if isinstance(body, dict) else None) or {}
+            if endpoint in ("/api/auth/register", "/api/auth/login"):
+                tester.token = data.get("token") or tester.token
+                tester.user_id = (data.get("user") or {}).get("id") or tester.user_id
+            elif endpoint == "/api/sites":
+                tester.site_id = (data.get("site") or {}).get("id") or tester.site_id
+
+    tester.generate_report("json")
+    tester.summarize_results()
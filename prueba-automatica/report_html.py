@@ -0,0 +1,354 @@
+"""Reporte de rendimiento en HTML autocontenido y exportación CSV.
+
+Los resultados se recorren una sola vez y en streaming: las latencias se
+acumulan en histogramas de buckets logarítmicos fijos (memoria constante por
+endpoint y ventana de tiempo), y cada fila se escribe al CSV al leerla. Las
+gráficas son SVG generado aquí mismo, sin JavaScript ni recursos externos,
+para que el HTML se pueda abrir sin conexión.
+"""
+import bisect
+import csv
+import datetime
+import glob
+import html
+import os
+
+from results import endpoint_key, format_ms, iter_report_tests
+
+# Límites superiores de los buckets (ms): crecen un 25 % por bucket, de 1 ms a ~2 min
+BUCKET_BOUNDS = tuple(round(1.25 ** index, 2) for index in range(53))
+
+CSV_COLUMNS = ("timestamp", "method", "endpoint", "route", "status_code", "success",
+               "duration_ms", "schema_errors", "notes")
+
+PALETTE = ("#2f6fde", "#e4572e", "#29a36a", "#f0a202", "#8e44ad", "#16a2b8")
+
+
+class Histogram:
+    """Histograma de latencias con buckets logarítmicos fijos"""
+
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Límite superior del bucket que contiene el percentil (error máximo del 25 %)"""
+        if not self.total:
+            return None
+        target = pct / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+class EndpointStats:
+    __slots__ = ("count", "errors", "status_codes", "error_notes", "histogram", "windows")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.status_codes = {}
+        self.error_notes = {}
+        self.histogram = Histogram()
+        self.windows = {}  # índice de ventana -> Histogram
+
+
+def timestamp_seconds(value):
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def collect(paths, window_s=60, csv_writer=None):
+    """Una pasada en streaming sobre los resultados; opcionalmente escribe el CSV"""
+    stats = {}
+    first = last = None
+    rows = 0
+    for path in paths:
+        for test in iter_report_tests(path):
+            rows += 1
+            key = endpoint_key(test)
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = EndpointStats()
+            entry.count += 1
+
+            status = test.get("status_code")
+            status_label = str(status) if status is not None else "sin respuesta"
+            entry.status_codes[status_label] = entry.status_codes.get(status_label, 0) + 1
+            failed = not test.get("success", True) or (status or 0) >= 400
+            if failed:
+                entry.errors += 1
+                reason = f"{status_label}: {test['notes']}" if test.get("notes") else status_label
+                entry.error_notes[reason] = entry.error_notes.get(reason, 0) + 1
+
+            seconds = timestamp_seconds(test.get("timestamp"))
+            if seconds is not None:
+                first = seconds if first is None else min(first, seconds)
+                last = seconds if last is None else max(last, seconds)
+
+            duration = test.get("duration_ms")
+            if duration is not None:
+                entry.histogram.add(duration)
+                if seconds is not None:
+                    window = int(seconds // window_s)
+                    histogram = entry.windows.get(window)
+                    if histogram is None:
+                        histogram = entry.windows[window] = Histogram()
+                    histogram.add(duration)
+
+            if csv_writer is not None:
+                csv_writer.writerow((
+                    test.get("timestamp"), test["method"], test["endpoint"], key.split(" ", 1)[1],
+                    "" if status is None else status, int(not failed),
+                    "" if duration is None else duration, len(test.get("schema_errors") or ()),
+                    test.get("notes") or "",
+                ))
+    return {"stats": stats, "rows": rows, "first": first, "last": last, "window_s": window_s}
+
+
+def summarize_run(path):
+    """Percentiles y tasa de error por endpoint de un reporte anterior"""
+    data = collect([path])
+    return {
+        "label": os.path.basename(path),
+        "started": data["first"],
+        "rows": data["rows"],
+        "endpoints": {
+            key: {"count": entry.count, "errors": entry.errors,
+                  "p50": entry.histogram.percentile(50), "p95": entry.histogram.percentile(95)}
+            for key, entry in data["stats"].items()
+        },
+    }
+
+
+def report_stamp(path):
+    """Segundos epoch del nombre api_test_report_<epoch>.json, o None"""
+    stamp = os.path.basename(path)[len("api_test_report_"):].split(".", 1)[0]
+    return int(stamp) if stamp.isdigit() else None
+
+
+def find_history(paths, history_dir, limit, started=None):
+    """Reportes de ejecuciones anteriores a la actual, del más antiguo al más reciente.
+
+    Se ordena por la marca epoch del nombre. Las horas de las filas son locales
+    y sin zona, así que started (la primera fila) solo se usa si ninguna entrada
+    tiene marca, p. ej. con el JSONL de un checkpoint.
+    """
+    current = {os.path.abspath(path) for path in paths}
+    stamps = [stamp for stamp in map(report_stamp, paths) if stamp is not None]
+    before = min(stamps) if stamps else started
+    if before is None or not limit:
+        return []
+
+    previous = []
+    for path in glob.glob(os.path.join(history_dir, "api_test_report_*.json")):
+        stamp = report_stamp(path)
+        if stamp is not None and stamp < before and os.path.abspath(path) not in current:
+            previous.append((stamp, path))
+    return [path for _, path in sorted(previous)[-limit:]]
+
+
+# SVG
+
+def svg_bar_chart(counts, labels, width=420, height=140):
+    peak = max(counts) or 1
+    bar_width = width / len(counts)
+    parts = [f'<svg viewBox="0 0 {width} {height + 18}" width="{width}" height="{height + 18}" role="img">']
+    for index, count in enumerate(counts):
+        bar_height = count / peak * height
+        parts.append(f'<rect x="{index * bar_width:.1f}" y="{height - bar_height:.1f}" '
+                     f'width="{max(bar_width - 1, 1):.1f}" height="{bar_height:.1f}" fill="{PALETTE[0]}">'
+                     f'<title>{html.escape(labels[index])}: {count}</title></rect>')
+    step = max(1, len(counts) // 6)
+    for index in range(0, len(counts), step):
+        parts.append(f'<text x="{index * bar_width:.1f}" y="{height + 14}" class="axis">'
+                     f'{html.escape(labels[index])}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def svg_line_chart(series, width=420, height=140, x_labels=None):
+    """series: {nombre: [valor o None, ...]} con el mismo número de puntos"""
+    values = [value for points in series.values() for value in points if value is not None]
+    if not values:
+        return '<p class="muted">Sin datos</p>'
+    peak = max(values) or 1
+    length = max(len(points) for points in series.values())
+    step = width / max(length - 1, 1)
+    parts = [f'<svg viewBox="0 0 {width + 40} {height + 18}" width="{width + 40}" height="{height + 18}" role="img">',
+             f'<text x="{width + 4}" y="10" class="axis">{format_ms(peak)} ms</text>',
+             f'<line x1="0" y1="{height}" x2="{width}" y2="{height}" class="grid"/>']
+    for color, (name, points) in zip(PALETTE, series.items()):
+        coords = " ".join(f"{index * step:.1f},{height - value / peak * height:.1f}"
+                          for index, value in enumerate(points) if value is not None)
+        parts.append(f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="1.5">'
+                     f'<title>{html.escape(name)}</title></polyline>')
+        if len(points) == 1 and points[0] is not None:
+            parts.append(f'<circle cx="0" cy="{height - points[0] / peak * height:.1f}" r="3" fill="{color}"/>')
+    if x_labels:
+        parts.append(f'<text x="0" y="{height + 14}" class="axis">{html.escape(x_labels[0])}</text>')
+        parts.append(f'<text x="{width}" y="{height + 14}" class="axis" text-anchor="end">'
+                     f'{html.escape(x_labels[-1])}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def legend(names):
+    return " ".join(f'<span class="legend" style="border-color:{color}">{html.escape(name)}</span>'
+                    for color, name in zip(PALETTE, names))
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    return datetime.datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_delta(before, after):
+    if before is None or after is None or before == 0:
+        return ""
+    change = (after - before) / before * 100
+    css = "worse" if change >= 20 else "better" if change <= -20 else "muted"
+    return f' <span class="{css}">({change:+.0f}%)</span>'
+
+
+# HTML
+
+STYLE = """
+body { font-family: -apple-system, Segoe UI, Roboto, sans-serif; margin: 24px; color: #222; }
+h1 { font-size: 22px; } h2 { font-size: 18px; margin-top: 32px; } h3 { font-size: 15px; margin-bottom: 4px; }
+table { border-collapse: collapse; font-size: 13px; margin: 8px 0; }
+th, td { border-bottom: 1px solid #ddd; padding: 4px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.axis { font-size: 10px; fill: #666; } .grid { stroke: #ccc; }
+.muted { color: #888; } .worse { color: #c0392b; } .better { color: #27ae60; }
+.endpoint { display: inline-block; vertical-align: top; margin: 0 24px 24px 0; }
+.legend { border-left: 10px solid; padding-left: 4px; margin-right: 10px; font-size: 12px; }
+"""
+
+
+def render_html(data, sources, history):
+    stats = data["stats"]
+    previous = history[-1] if history else None
+    total_errors = sum(entry.errors for entry in stats.values())
+    out = [f"<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">"
+           f"<title>Reporte de rendimiento de la API</title><style>{STYLE}</style></head><body>",
+           "<h1>Reporte de rendimiento de la API</h1>",
+           f"<p>Fuentes: {html.escape(', '.join(os.path.basename(path) for path in sources))}<br>"
+           f"Periodo: {format_time(data['first'])} – {format_time(data['last'])}<br>"
+           f"Solicitudes: {data['rows']} · Errores: {total_errors} · Endpoints: {len(stats)}"
+           + (f"<br>Comparado con: {html.escape(previous['label'])}" if previous else "") + "</p>"]
+
+    # Resumen por endpoint
+    out.append("<h2>Resumen por endpoint</h2><table><tr><th>Endpoint</th><th>Solicitudes</th><th>Errores</th>"
+               "<th>P50 (ms)</th><th>P95 (ms)</th><th>P99 (ms)</th><th>Máx (ms)</th></tr>")
+    for key, entry in sorted(stats.items()):
+        histogram = entry.histogram
+        before = previous["endpoints"].get(key, {}) if previous else {}
+        out.append(
+            f"<tr><td>{html.escape(key)}</td><td>{entry.count}</td>"
+            f"<td>{entry.errors} ({entry.errors / entry.count * 100:.0f}%)</td>"
+            f"<td>{format_ms(histogram.percentile(50))}{format_delta(before.get('p50'), histogram.percentile(50))}</td>"
+            f"<td>{format_ms(histogram.percentile(95))}{format_delta(before.get('p95'), histogram.percentile(95))}</td>"
+            f"<td>{format_ms(histogram.percentile(99))}</td>"
+            f"<td>{format_ms(histogram.max if histogram.total else None)}</td></tr>")
+    out.append("</table><p class=\"muted\">Percentiles estimados a partir de histogramas "
+               "(límite superior del bucket, error máximo del 25 %).</p>")
+
+    # Distribución y evolución de la latencia
+    out.append(f"<h2>Latencia por endpoint</h2><p>{legend(['p50', 'p95', 'p99'])}"
+               f" · ventanas de {data['window_s']} s</p>")
+    labels = [f"{bound:g}" for bound in BUCKET_BOUNDS] + ["+"]
+    timed = [(key, entry) for key, entry in sorted(stats.items()) if entry.histogram.total]
+    if not timed:
+        out.append('<p class="muted">Los resultados no incluyen latencias (reportes anteriores a la medición '
+                   'de duration_ms).</p>')
+    for key, entry in timed:
+        counts = entry.histogram.counts
+        used = [index for index, count in enumerate(counts) if count]
+        low, high = used[0], used[-1] + 1
+        windows = sorted(entry.windows)
+        series = {f"p{pct}": [entry.windows[window].percentile(pct) for window in windows] for pct in (50, 95, 99)}
+        x_labels = [format_time(windows[0] * data["window_s"]), format_time(windows[-1] * data["window_s"])] \
+            if windows else None
+        out.append(
+            f'<div class="endpoint"><h3>{html.escape(key)}</h3>'
+            f"{svg_bar_chart(counts[low:high], labels[low:high])}<br>"
+            f"{svg_line_chart(series, x_labels=x_labels)}</div>")
+
+    # Errores
+    out.append("<h2>Errores</h2>")
+    failing = [(key, entry) for key, entry in sorted(stats.items()) if entry.errors]
+    if not failing:
+        out.append("<p>Sin errores.</p>")
+    else:
+        out.append("<table><tr><th>Endpoint</th><th>Motivo</th><th>Veces</th></tr>")
+        for key, entry in failing:
+            for reason, count in sorted(entry.error_notes.items(), key=lambda item: -item[1]):
+                out.append(f"<tr><td>{html.escape(key)}</td><td>{html.escape(reason)}</td><td>{count}</td></tr>")
+        out.append("</table>")
+        out.append(svg_bar_chart([entry.errors for _, entry in failing],
+                                 [key for key, _ in failing], width=max(200, 24 * len(failing))))
+
+    # Histórico
+    if history:
+        runs = history + [{"label": "actual", "started": data["first"], "rows": data["rows"], "endpoints": {
+            key: {"count": entry.count, "errors": entry.errors,
+                  "p50": entry.histogram.percentile(50), "p95": entry.histogram.percentile(95)}
+            for key, entry in stats.items()}}]
+        out.append(f"<h2>Comparación con ejecuciones anteriores</h2><p>{legend(['p50', 'p95'])}</p>"
+                   "<table><tr><th>Endpoint</th><th>Tendencia</th>"
+                   + "".join(f"<th>{html.escape(format_time(run['started']))}<br>p50 / p95</th>" for run in runs)
+                   + "</tr>")
+        for key in sorted({key for run in runs for key in run["endpoints"]}):
+            cells = []
+            p50 = []
+            p95 = []
+            for run in runs:
+                entry = run["endpoints"].get(key)
+                p50.append(entry["p50"] if entry else None)
+                p95.append(entry["p95"] if entry else None)
+                cells.append(f"<td>{format_ms(p50[-1])} / {format_ms(p95[-1])}</td>" if entry else "<td>-</td>")
+            trend = svg_line_chart({"p50": p50, "p95": p95}, width=120, height=30)
+            out.append(f"<tr><td>{html.escape(key)}</td><td>{trend}</td>{''.join(cells)}</tr>")
+        out.append("</table>")
+
+    out.append("</body></html>")
+    return "\n".join(out)
+
+
+def render_report(paths, out_prefix=None, history_dir=None, history_limit=5, window_s=60):
+    out_prefix = out_prefix or os.path.splitext(paths[-1])[0]
+    csv_path = f"{out_prefix}.csv"
+    html_path = f"{out_prefix}.html"
+
+    print(f"Procesando {', '.join(paths)}...")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        data = collect(paths, window_s=window_s, csv_writer=writer)
+
+    history_dir = history_dir or os.path.dirname(os.path.abspath(paths[-1]))
+    history = [summarize_run(path)
+               for path in find_history(paths, history_dir, history_limit, started=data["first"])]
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(render_html(data, paths, history))
+
+    print(f"✅ Reporte HTML generado: {html_path}")
+    print(f"✅ Exportación CSV generada: {csv_path} ({data['rows']} filas)")
+    return html_path, csv_path
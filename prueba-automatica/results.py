@@ -0,0 +1,135 @@
+"""Utilidades ligeras para leer y resumir resultados de pruebas.
+
+Solo usa la biblioteca estándar para que los subcomandos que trabajan sobre
+reportes guardados arranquen sin importar el cliente HTTP.
+"""
+import json
+import math
+import re
+
+# Los IDs de documentos de Appwrite son 20 caracteres hexadecimales
+ID_SEGMENT = re.compile(r"/[0-9a-f]{20}(?=/|$)")
+
+
+def normalize_endpoint(endpoint):
+    """Sustituye los IDs de documento por ':id' para agrupar por ruta"""
+    return ID_SEGMENT.sub("/:id", endpoint)
+
+
+def endpoint_key(test):
+    return f"{test['method']} {normalize_endpoint(test['endpoint'])}"
+
+
+def iter_report_tests(path):
+    """Recorre los resultados de un reporte JSON o de un fichero JSONL de resultados.
+
+    Ambos formatos se leen de forma incremental, así que la memoria no crece
+    con el tamaño del fichero.
+    """
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f, "tests")
+
+
+class _ChunkReader:
+    """Búfer sobre un fichero de texto que se amplía a medida que se consume"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Siguiente carácter que no sea espacio (sin consumirlo), o '' al final"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Se esperaba '{char}' en el reporte JSON")
+        self.pos += 1
+
+    def decode(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # Un número cortado por el bloque ("2." de "2.5e3") se decodifica sin error:
+            # solo se acepta el valor si le sigue un delimitador
+            complete = end < len(self.buffer) and self.buffer[end] in ",]}: \t\r\n"
+            if not complete and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f, key, chunk_size=1 << 16):
+    """Devuelve uno a uno los elementos de la lista `key` de un objeto JSON de primer nivel"""
+    reader = _ChunkReader(f, chunk_size)
+    decoder = json.JSONDecoder()
+    reader.expect("{")
+    while reader.peek() not in ("}", ""):
+        name = reader.decode(decoder)
+        reader.expect(":")
+        if name != key:
+            reader.decode(decoder)
+        else:
+            reader.expect("[")
+            while reader.peek() != "]":
+                yield reader.decode(decoder)
+                if reader.peek() == ",":
+                    reader.pos += 1
+            reader.pos += 1
+        if reader.peek() == ",":
+            reader.pos += 1
+
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(durations):
+    """Resumen de latencias (ms): cuenta, media, p50, p95, p99 y máximo"""
+    values = sorted(durations)
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
+
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.0f}"
@@ -0,0 +1,196 @@
+"""Validación de respuestas contra los esquemas OpenAPI de src/config/swagger.js.
+
+Cada esquema se compila una sola vez en un árbol de funciones (con las $ref
+ya resueltas), así que validar una respuesta no vuelve a interpretar la
+especificación. La validación puede muestrearse para no frenar la carga; la
+muestra se toma por ruta, para que todas las rutas se validen aunque el
+orden de los pasos se repita.
+"""
+import itertools
+import json
+import re
+
+TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+def load_spec(path=None, base_url=None, session=None):
+    """Carga la especificación desde un fichero exportado o desde /api/docs.json"""
+    if path:
+        with open(path) as f:
+            return json.load(f)
+
+    import requests
+    response = (session or requests).get(f"{base_url}/api/docs.json", timeout=20)
+    response.raise_for_status()
+    return response.json()
+
+
+def compile_schema(schema, spec, cache=None):
+    """Devuelve una función validate(value, path, errors) para el esquema dado"""
+    cache = {} if cache is None else cache
+
+    ref = schema.get("$ref")
+    if ref:
+        if ref not in cache:
+            # Se registra antes de compilar para soportar esquemas recursivos
+            slot = []
+            cache[ref] = lambda value, path, errors: slot[0](value, path, errors)
+            target = spec
+            for part in ref.lstrip("#/").split("/"):
+                target = target[part]
+            slot.append(compile_schema(target, spec, cache))
+        return cache[ref]
+
+    checks = []
+    nullable = schema.get("nullable", False)
+
+    schema_type = schema.get("type")
+    if schema_type in TYPE_CHECKS:
+        type_check = TYPE_CHECKS[schema_type]
+
+        def check_type(value, path, errors):
+            if not type_check(value):
+                errors.append(f"{path}: se esperaba {schema_type}, llegó {type(value).__name__}")
+                return False
+            return True
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: valor {value!r} fuera de {sorted(allowed)}")
+                return False
+            return True
+        checks.append(check_enum)
+
+    required = tuple(schema.get("required", ()))
+    properties = tuple(
+        (name, compile_schema(subschema, spec, cache))
+        for name, subschema in schema.get("properties", {}).items()
+    )
+    if required or properties:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            ok = True
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}.{name}: campo obligatorio ausente")
+                    ok = False
+            for name, validate in properties:
+                if name in value:
+                    ok = validate(value[name], f"{path}.{name}", errors) and ok
+            return ok
+        checks.append(check_object)
+
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"], spec, cache)
+
+        def check_items(value, path, errors):
+            if not isinstance(value, list):
+                return True
+            ok = True
+            for index, item in enumerate(value):
+                ok = validate_item(item, f"{path}[{index}]", errors) and ok
+            return ok
+        checks.append(check_items)
+
+    for subschema in schema.get("allOf", ()):
+        checks.append(compile_schema(subschema, spec, cache))
+
+    alternatives = [compile_schema(subschema, spec, cache)
+                    for subschema in schema.get("oneOf", ()) or schema.get("anyOf", ())]
+    if alternatives:
+        def check_alternatives(value, path, errors):
+            for validate in alternatives:
+                if validate(value, path, []):
+                    return True
+            errors.append(f"{path}: no coincide con ninguna alternativa")
+            return False
+        checks.append(check_alternatives)
+
+    checks = tuple(checks)
+
+    def validate(value, path, errors):
+        if value is None and nullable:
+            return True
+        ok = True
+        for check in checks:
+            ok = check(value, path, errors) and ok
+        return ok
+
+    return validate
+
+
+def path_regex(template):
+    """'/api/sites/{id}/ssl' -> expresión que acepta cualquier segmento en {id}"""
+    pattern = re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(template))
+    return re.compile(f"^{pattern}$")
+
+
+class SchemaValidator:
+    """Validadores compilados por operación (método + ruta) y código de estado"""
+
+    def __init__(self, spec, sample_rate=1.0):
+        self.sample_rate = sample_rate
+        self._every = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        self._routes = {}    # método -> [(regex, plantilla, {estado: validador})]
+        self._resolved = {}  # (método, endpoint) -> (plantilla, {estado: validador})
+        self._counters = {}  # (método, plantilla) -> contador de respuestas validables
+
+        cache = {}
+        for template, operations in spec.get("paths", {}).items():
+            regex = path_regex(template)
+            for method, operation in operations.items():
+                validators = {}
+                for status, response in (operation.get("responses") or {}).items():
+                    schema = (((response or {}).get("content") or {}).get("application/json") or {}).get("schema")
+                    if schema:
+                        validators[str(status)] = compile_schema(schema, spec, cache)
+                if validators:
+                    self._routes.setdefault(method.upper(), []).append((regex, template, validators))
+
+    def resolve(self, method, endpoint):
+        """(plantilla de la ruta, {estado: validador}) para un endpoint concreto"""
+        key = (method, endpoint)
+        if key not in self._resolved:
+            path = endpoint.split("?", 1)[0]
+            self._resolved[key] = next(
+                ((template, validators) for regex, template, validators in self._routes.get(method, ())
+                 if regex.match(path)), (None, {}))
+        return self._resolved[key]
+
+    def validate(self, method, endpoint, status, load_body):
+        """Lista de errores, o None si la respuesta no se valida (sin esquema o fuera de la muestra).
+
+        load_body solo se llama si la respuesta entra en la muestra, para no
+        decodificar JSON en las que se omiten.
+        """
+        if not self._every:
+            return None
+        template, validators = self.resolve(method, endpoint)
+        validate = validators.get(str(status))
+        if validate is None:
+            return None
+        # Un contador por ruta: solo cuentan las respuestas que tienen esquema
+        counter = self._counters.get((method, template))
+        if counter is None:
+            counter = self._counters.setdefault((method, template), itertools.count())
+        if next(counter) % self._every:
+            return None
+        try:
+            body = load_body()
+        except ValueError:
+            return ["$: la respuesta no es JSON"]
+        errors = []
+        validate(body, "$", errors)
+        return errors
@@ -1,14 +1,43 @@
-import requests
+import argparse
 import json
 import time
 import datetime
+import glob
 import os
 import sys
-from pprint import pformat
 import traceback
 
+from results import endpoint_key, normalize_endpoint
+
+# Los módulos pesados (requests, renderizadores de reportes, runners de carga)
+# se importan dentro de las funciones que los usan para que el CLI arranque rápido.
+
+DEFAULT_CHECKPOINT = "api_test_session.checkpoint.json"
+
+# Mensajes que se muestran antes de ciertos pasos del plan de pruebas
+STAGE_BANNERS = {
+    "run_site_ssl_check": "\nEjecutando pruebas de monitoreo con pausas entre ellas...\n",
+    "run_site_monitor_check": "\nEjecutando pruebas en puntos críticos con mayor tiempo de espera...\n",
+}
+
+# Pasos que necesitan un sitio creado (usan self.site_id)
+SITE_STEPS = {
+    "get_site_detail", "update_site",
+    "run_site_ssl_check", "run_site_performance_check", "run_site_keyword_check",
+    "run_site_hotspots_check", "run_site_monitor_check", "run_site_basic_check",
+    "get_site_monitor_history", "update_monitor_settings", "run_monitor_basic_check",
+    "run_monitor_ssl_check", "run_monitor_performance_check", "run_monitor_keywords_check",
+    "run_monitor_hotspots_check", "run_monitor_full_check", "get_monitor_history",
+}
+
+# Pasos que no requieren autenticación
+PUBLIC_STEPS = {"check_health", "register_user"}
+
+# Pasos cuyos endpoints no están en la especificación OpenAPI (/health se define en server.js)
+UNDOCUMENTED_STEPS = {"check_health"}
+
 class ApiTester:
-    def __init__(self, base_url="https://web-production-8d975.up.railway.app"):
+    def __init__(self, base_url="https://web-production-8d975.up.railway.app", checkpoint_path=None):
         self.base_url = base_url
         self.token = None
         self.user_id = None
@@ -22,6 +51,44 @@ class ApiTester:
         self.max_retries = 3
         self.retry_delay = 2  # segundos
 
+        # Estado de la sesión para poder reanudarla tras una caída
+        self.checkpoint_path = checkpoint_path
+        self.iteration = 1
+        self.iterations = 1
+        self.completed_steps = []
+        self.aggregates = {}
+        self.persisted_results = 0
+
+        # Registro de métricas en vivo (ver metrics.py); None si no se exportan
+        self.metrics = None
+
+        # Validador de esquemas OpenAPI (ver schemas.py); None si no se valida
+        self.schema_validator = None
+
+        # En carga no se guardan ni se decodifican los cuerpos de las respuestas
+        self.keep_bodies = True
+        self.session = None
+
+    def update_aggregates(self, result):
+        """Acumula contadores y latencias por endpoint sin recorrer todos los resultados"""
+        key = endpoint_key(result)
+        agg = self.aggregates.setdefault(key, {
+            "count": 0, "success": 0, "failed": 0,
+            "total_ms": 0.0, "max_ms": 0.0, "status_codes": {}
+        })
+        agg["count"] += 1
+        if result["success"]:
+            agg["success"] += 1
+        else:
+            agg["failed"] += 1
+        duration = result.get("duration_ms")
+        if duration is not None:
+            agg["total_ms"] += duration
+            agg["max_ms"] = max(agg["max_ms"], duration)
+        status = result.get("status_code")
+        if status is not None:
+            agg["status_codes"][str(status)] = agg["status_codes"].get(str(status), 0) + 1
+
     def add_result(self, endpoint, method, payload=None, response=None, success=True, notes=None):
         result = {
             "endpoint": endpoint,
@@ -31,13 +98,28 @@ class ApiTester:
             "payload": payload
         }
         
-        if response:
-            if isinstance(response, requests.Response):
-                try:
-                    result["response"] = response.json()
-                except:
-                    result["response"] = {"text": response.text, "status_code": response.status_code}
+        if response is not None:
+            if hasattr(response, "status_code"):
+                # El cuerpo se decodifica una sola vez y se reutiliza para validar el esquema
+                load_body = response.json
+                if self.keep_bodies:
+                    try:
+                        body = response.json()
+                        result["response"] = body
+                        load_body = lambda: body
+                    except:
+                        result["response"] = {"text": response.text, "status_code": response.status_code}
                 result["status_code"] = response.status_code
+                result["duration_ms"] = round(response.elapsed.total_seconds() * 1000, 2)
+
+                if self.schema_validator is not None:
+                    errors = self.schema_validator.validate(method, endpoint, response.status_code, load_body)
+                    if errors:
+                        # Un 2xx con un cuerpo roto no debe contar como éxito
+                        result["success"] = False
+                        result["schema_errors"] = errors[:10]
+                        notes = notes or "La respuesta no coincide con el esquema OpenAPI"
+                        print(f"  ⚠️ Respuesta fuera de esquema ({len(errors)} errores): {errors[0]}")
             else:
                 result["response"] = response
         
@@ -45,32 +127,161 @@ class ApiTester:
             result["notes"] = notes
             
         self.results["tests"].append(result)
+        self.update_aggregates(result)
         return result
 
+    # CHECKPOINTS
+
+    def results_log_path(self):
+        return f"{self.checkpoint_path}.results.jsonl"
+
+    def save_checkpoint(self):
+        """Guarda el estado de la sesión y los agregados parciales en disco.
+
+        Los resultados se añaden a un fichero JSONL aparte, de modo que cada
+        checkpoint solo escribe lo nuevo y el fichero de estado sigue siendo pequeño.
+        """
+        if not self.checkpoint_path:
+            return
+
+        pending = self.results["tests"][self.persisted_results:]
+        if pending:
+            with open(self.results_log_path(), "a") as f:
+                for test in pending:
+                    f.write(json.dumps(test) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.persisted_results = len(self.results["tests"])
+
+        state = {
+            "saved_at": datetime.datetime.now().isoformat(),
+            "base_url": self.base_url,
+            "started_at": self.results["timestamp"],
+            "email": self.email,
+            "password": self.password,
+            "token": self.token,
+            "user_id": self.user_id,
+            "site_id": self.site_id,
+            "iteration": self.iteration,
+            "iterations": self.iterations,
+            "completed_steps": self.completed_steps,
+            "persisted_results": self.persisted_results,
+            "aggregates": self.aggregates
+        }
+
+        # Escritura atómica: un corte a mitad no deja un checkpoint corrupto
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self):
+        """Restaura una sesión previa. Devuelve False si no hay checkpoint"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+
+        self.base_url = state["base_url"]
+        self.results["timestamp"] = state["started_at"]
+        self.email = state["email"]
+        self.password = state["password"]
+        self.token = state["token"]
+        self.user_id = state["user_id"]
+        self.site_id = state["site_id"]
+        self.iteration = state["iteration"]
+        self.iterations = state.get("iterations", self.iteration)
+        self.completed_steps = state["completed_steps"]
+        self.aggregates = state["aggregates"]
+        self.persisted_results = state["persisted_results"]
+
+        # Solo se recuperan los resultados confirmados por el checkpoint;
+        # las líneas escritas después (o a medias) se descartan
+        tests = []
+        if os.path.exists(self.results_log_path()):
+            with open(self.results_log_path()) as f:
+                for line in f:
+                    if len(tests) >= self.persisted_results:
+                        break
+                    tests.append(json.loads(line))
+        self.results["tests"] = tests
+        self.persisted_results = len(tests)
+        with open(self.results_log_path(), "w") as f:
+            for test in tests:
+                f.write(json.dumps(test) + "\n")
+
+        print(f"↩️  Reanudando sesión de {self.email} (iteración {self.iteration}/{self.iterations}, "
+              f"{len(self.completed_steps)} pasos completados, {len(tests)} resultados)")
+        self.print_aggregates()
+        return True
+
+    def clear_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        for path in (self.checkpoint_path, self.results_log_path()):
+            if os.path.exists(path):
+                os.remove(path)
+
     def get_headers(self):
         headers = {"Content-Type": "application/json"}
         if self.token:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
+    def open_session(self):
+        """Crea la sesión HTTP (e importa requests) si aún no existe"""
+        if self.session is None:
+            import requests
+            # Una sesión por probador reutiliza las conexiones TCP/TLS entre solicitudes
+            self.session = requests.Session()
+        return self.session
+
+    def send_request(self, method, endpoint, payload=None, timeout=20):
+        """Realizar un único intento HTTP. Todas las solicitudes pasan por aquí"""
+        method = method.upper()
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Método HTTP no soportado: {method}")
+
+        self.open_session()
+        url = f"{self.base_url}{endpoint}"
+        metrics = self.metrics
+        if metrics is None:
+            return self.session.request(method, url, headers=self.get_headers(), json=payload, timeout=timeout)
+
+        route = normalize_endpoint(endpoint)
+        metrics.request_started(route, method)
+        status = "error"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=self.get_headers(), json=payload, timeout=timeout)
+            status = response.status_code
+            return response
+        finally:
+            metrics.request_finished(route, method, status, time.perf_counter() - start)
+
+    def retry_after_delay(self, response, max_delay=60):
+        """Segundos de espera indicados por Retry-After (o el retardo por defecto)"""
+        value = response.headers.get("Retry-After", "")
+        if value.isdigit():
+            return min(int(value), max_delay)
+        return self.retry_delay
+
     def make_request(self, method, endpoint, payload=None, retry_on_failure=True):
         """Realizar una solicitud HTTP con reintentos en caso de error"""
-        url = f"{self.base_url}{endpoint}"
-        headers = self.get_headers()
-        
         for attempt in range(self.max_retries):
             try:
-                if method.upper() == "GET":
-                    response = requests.get(url, headers=headers, timeout=20)
-                elif method.upper() == "POST":
-                    response = requests.post(url, headers=headers, json=payload, timeout=20)
-                elif method.upper() == "PUT":
-                    response = requests.put(url, headers=headers, json=payload, timeout=20)
-                elif method.upper() == "DELETE":
-                    response = requests.delete(url, headers=headers, timeout=20)
-                else:
-                    raise ValueError(f"Método HTTP no soportado: {method}")
+                response = self.send_request(method, endpoint, payload)
                 
+                # Limitado por tasa: esperar lo que indique Retry-After antes de reintentar
+                if retry_on_failure and response.status_code == 429 and attempt < self.max_retries - 1:
+                    delay = self.retry_after_delay(response)
+                    print(f"  ⚠️ Intento {attempt+1}: Límite de tasa (429) en {endpoint} - Reintentando en {delay}s")
+                    time.sleep(delay)
+                    continue
+
                 # Si tenemos éxito o no es un error de servidor, devolvemos la respuesta
                 if not retry_on_failure or response.status_code < 500:
                     return response
@@ -88,6 +299,24 @@ class ApiTester:
         # Si llegamos aquí, todos los intentos han fallado
         return response  # Devolvemos la última respuesta con error
 
+    def check_health(self):
+        print("0. Comprobando el estado del servicio...")
+        endpoint = "/health"
+        
+        try:
+            response = self.make_request("GET", endpoint)
+            result = self.add_result(endpoint, "GET", None, response, response.status_code == 200)
+            
+            if response.status_code == 200:
+                print("  ✅ Servicio disponible")
+            else:
+                print(f"  ❌ Servicio no disponible: {response.status_code}")
+            
+            return result
+        except Exception as e:
+            print(f"  ❌ Excepción al comprobar el estado: {str(e)}")
+            return self.add_result(endpoint, "GET", None, str(e), False, "Error en la solicitud")
+
     def register_user(self):
         print("1. Registrando nuevo usuario...")
         endpoint = "/api/auth/register"
@@ -199,10 +428,7 @@ class ApiTester:
         print("5. Obteniendo lista de sitios...")
         endpoint = "/api/sites"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -222,10 +448,7 @@ class ApiTester:
         print(f"6. Obteniendo detalles del sitio (ID: {self.site_id})...")
         endpoint = f"/api/sites/{self.site_id}"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -248,11 +471,7 @@ class ApiTester:
             "url": "https://portafolio-six-sigma-45.vercel.app"
         }
         
-        response = requests.put(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers(),
-            json=payload
-        )
+        response = self.send_request("PUT", endpoint, payload)
         
         result = self.add_result(endpoint, "PUT", payload, response)
         
@@ -267,10 +486,7 @@ class ApiTester:
         print("8. Obteniendo logs de actividad...")
         endpoint = "/api/logs"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -286,10 +502,7 @@ class ApiTester:
         print("9. Obteniendo estadísticas generales...")
         endpoint = "/api/stats"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -304,10 +517,7 @@ class ApiTester:
         print("10. Obteniendo estadísticas de usuario...")
         endpoint = "/api/stats/user"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -322,10 +532,7 @@ class ApiTester:
         print("11. Obteniendo distribución de actividad...")
         endpoint = "/api/stats/activity"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -398,10 +605,7 @@ class ApiTester:
         print(f"14. Ejecutando verificación SSL del sitio...")
         endpoint = f"/api/sites/{self.site_id}/ssl"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -420,10 +624,7 @@ class ApiTester:
         print(f"15. Ejecutando análisis de rendimiento del sitio...")
         endpoint = f"/api/sites/{self.site_id}/performance"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -442,10 +643,7 @@ class ApiTester:
         print(f"16. Ejecutando análisis de palabras clave del sitio...")
         endpoint = f"/api/sites/{self.site_id}/keywords"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -464,10 +662,7 @@ class ApiTester:
         print(f"17. Identificando puntos críticos del sitio...")
         endpoint = f"/api/sites/{self.site_id}/hotspots"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -519,11 +714,7 @@ class ApiTester:
             "alertThreshold": 2000
         }
         
-        response = requests.put(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers(),
-            json=payload
-        )
+        response = self.send_request("PUT", endpoint, payload)
         
         result = self.add_result(endpoint, "PUT", payload, response)
         
@@ -542,10 +733,7 @@ class ApiTester:
         print(f"20. Ejecutando verificación básica mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/basic"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -564,10 +752,7 @@ class ApiTester:
         print(f"21. Ejecutando verificación SSL mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/ssl"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -586,10 +771,7 @@ class ApiTester:
         print(f"22. Ejecutando análisis de rendimiento mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/performance"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -608,10 +790,7 @@ class ApiTester:
         print(f"23. Ejecutando análisis de palabras clave mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/keywords"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -630,10 +809,7 @@ class ApiTester:
         print(f"24. Identificando puntos críticos mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/hotspots"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -652,10 +828,7 @@ class ApiTester:
         print(f"25. Ejecutando verificación completa mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/full"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -674,10 +847,7 @@ class ApiTester:
         print(f"26. Obteniendo historial mediante el monitor...")
         endpoint = f"/api/monitor/site/{self.site_id}/history"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -692,10 +862,7 @@ class ApiTester:
         print(f"27. Obteniendo resumen de monitoreo para administrador...")
         endpoint = f"/api/monitor/admin/overview"
         
-        response = requests.get(
-            f"{self.base_url}{endpoint}",
-            headers=self.get_headers()
-        )
+        response = self.send_request("GET", endpoint)
         
         result = self.add_result(endpoint, "GET", None, response)
         
@@ -707,6 +874,8 @@ class ApiTester:
         return result
 
     def generate_report(self, format="json"):
+        from pprint import pformat
+
         print(f"\nGenerando reporte en formato {format.upper()}...")
         
         if format == "json":
@@ -742,81 +911,107 @@ class ApiTester:
         print(f"✅ Reporte generado: {filename}")
         return filename
 
-    def run_all_tests(self):
-        print("\n📊 INICIANDO PRUEBAS DE LA API MICRO SAAS 📊\n")
-        
-        try:
+    def test_plan(self):
+        """Secuencia de pruebas: (nombre del paso, pausa previa en segundos, es de preparación).
+
+        Los pasos de preparación (registro, login y creación del sitio) solo se
+        ejecutan en la primera iteración.
+        """
+        return [
             # Autenticación
-            self.register_user()
-            self.login()
-            self.get_profile()
-            
+            ("register_user", 0, True),
+            ("login", 0, True),
+            ("get_profile", 0, False),
+
             # Sitios
-            self.create_site()
-            time.sleep(1)
-            self.get_sites()
-            time.sleep(1)
-            self.get_site_detail()
-            time.sleep(1)
-            self.update_site()
-            
+            ("create_site", 0, True),
+            ("get_sites", 1, False),
+            ("get_site_detail", 1, False),
+            ("update_site", 1, False),
+
             # Logs y estadísticas
-            time.sleep(1)
-            self.get_logs()
-            time.sleep(1)
-            self.get_stats()
-            time.sleep(1)
-            self.get_user_stats()
-            time.sleep(1)
-            self.get_activity_distribution()
-            
+            ("get_logs", 1, False),
+            ("get_stats", 1, False),
+            ("get_user_stats", 1, False),
+            ("get_activity_distribution", 1, False),
+
             # Pruebas de monitoreo (endpoints en /api/sites/:id/...)
             # Añadimos un tiempo de espera entre pruebas para permitir que el servidor se recupere
-            print("\nEjecutando pruebas de monitoreo con pausas entre ellas...\n")
-            
-            time.sleep(1)
-            self.run_site_ssl_check()
-            time.sleep(1)
-            self.run_site_performance_check()
-            time.sleep(1)
-            self.run_site_keyword_check()
-            time.sleep(1)
-            self.run_site_hotspots_check()
-            time.sleep(1)
-            
+            ("run_site_ssl_check", 1, False),
+            ("run_site_performance_check", 1, False),
+            ("run_site_keyword_check", 1, False),
+            ("run_site_hotspots_check", 1, False),
+
             # Ahora probamos las rutas problemáticas con reintentos adicionales
-            print("\nEjecutando pruebas en puntos críticos con mayor tiempo de espera...\n")
-            
-            time.sleep(2)
-            self.run_site_monitor_check()
-            time.sleep(2)
-            self.run_site_basic_check() 
-            time.sleep(2)
-            self.get_site_monitor_history()
-            
+            ("run_site_monitor_check", 3, False),
+            ("run_site_basic_check", 2, False),
+            ("get_site_monitor_history", 2, False),
+
             # Pruebas de monitoreo (endpoints en /api/monitor/...)
-            time.sleep(1)
-            self.update_monitor_settings()
-            time.sleep(1)
-            self.run_monitor_basic_check()
-            time.sleep(1)
-            self.run_monitor_ssl_check()
-            time.sleep(1)
-            self.run_monitor_performance_check()
-            time.sleep(1)
-            self.run_monitor_keywords_check()
-            time.sleep(1)
-            self.run_monitor_hotspots_check()
-            time.sleep(1)
-            self.run_monitor_full_check()
-            time.sleep(1)
-            self.get_monitor_history()
-            time.sleep(1)
-            self.get_admin_monitor_overview()
+            ("update_monitor_settings", 1, False),
+            ("run_monitor_basic_check", 1, False),
+            ("run_monitor_ssl_check", 1, False),
+            ("run_monitor_performance_check", 1, False),
+            ("run_monitor_keywords_check", 1, False),
+            ("run_monitor_hotspots_check", 1, False),
+            ("run_monitor_full_check", 1, False),
+            ("get_monitor_history", 1, False),
+            ("get_admin_monitor_overview", 1, False),
+        ]
+
+    def select_plan(self, only=None):
+        """Filtra el plan por nombre de paso añadiendo los pasos previos necesarios"""
+        probes = [("check_health", 0, False)]
+        plan = self.test_plan()
+        if not only:
+            return plan
+
+        available = {name for name, _, _ in probes + plan}
+        unknown = [name for name in only if name not in available]
+        if unknown:
+            raise ValueError(f"Pasos desconocidos: {', '.join(unknown)}")
+
+        selected = set(only)
+        if selected - PUBLIC_STEPS:
+            selected |= {"register_user", "login"}
+        if selected & SITE_STEPS:
+            selected.add("create_site")
+        return [step for step in probes + plan if step[0] in selected]
+
+    def run_all_tests(self, iterations=None, plan=None, pauses=True):
+        """Ejecuta el plan; sin iterations se usan las de la sesión (las del checkpoint al reanudar)"""
+        if iterations is not None:
+            self.iterations = iterations
+        print("\n📊 INICIANDO PRUEBAS DE LA API MICRO SAAS 📊\n")
+        
+        try:
+            while self.iteration <= self.iterations:
+                if self.iterations > 1:
+                    print(f"\n🔁 Iteración {self.iteration}/{self.iterations}\n")
+
+                for name, pause, setup in plan or self.test_plan():
+                    if name in self.completed_steps:
+                        continue
+                    if setup and self.iteration > 1:
+                        continue
+
+                    if name in STAGE_BANNERS:
+                        print(STAGE_BANNERS[name])
+                    if pause and pauses:
+                        time.sleep(pause)
+
+                    getattr(self, name)()
+                    self.completed_steps.append(name)
+                    self.save_checkpoint()
+
+                self.iteration += 1
+                self.completed_steps = []
+                self.save_checkpoint()
             
             # Generar reporte
             self.generate_report("json")
             self.generate_report("txt")
+            self.clear_checkpoint()
             
             print("\n🎉 PRUEBAS COMPLETADAS 🎉")
             self.summarize_results()
@@ -824,35 +1019,353 @@ class ApiTester:
         except Exception as e:
             print(f"\n❌ ERROR GENERAL DURANTE LAS PRUEBAS: {str(e)}")
             traceback.print_exc()
+            # Se guarda antes de registrar el error: al reanudar se repite el paso fallido
+            self.save_checkpoint()
             self.add_result("ERROR", "ERROR", None, str(e), False, "Error durante la ejecución de pruebas")
             self.generate_report("json")
             self.generate_report("txt")
+            if self.checkpoint_path:
+                print(f"💾 Estado guardado en {self.checkpoint_path}. Usa --resume para continuar")
             sys.exit(1)
     
     def summarize_results(self):
-        """Presenta un resumen de los resultados de las pruebas"""
-        total_tests = len(self.results["tests"])
-        successful_tests = sum(1 for test in self.results["tests"] if test["success"])
+        """Presenta un resumen de los resultados a partir de los agregados por endpoint"""
+        total_tests = sum(agg["count"] for agg in self.aggregates.values())
+        successful_tests = sum(agg["success"] for agg in self.aggregates.values())
         failed_tests = total_tests - successful_tests
         
         print(f"\n==== RESUMEN DE PRUEBAS ====")
         print(f"Total de pruebas ejecutadas: {total_tests}")
         print(f"Pruebas exitosas: {successful_tests}")
         print(f"Pruebas fallidas: {failed_tests}")
+        self.print_aggregates()
         
         if failed_tests > 0:
             print("\nEndpoints con problemas:")
-            for test in self.results["tests"]:
-                if not test["success"]:
-                    print(f"- {test['method']} {test['endpoint']}")
+            for key, agg in self.aggregates.items():
+                if agg["failed"]:
+                    print(f"- {key} ({agg['failed']}/{agg['count']})")
 
+    def print_aggregates(self):
+        """Tabla por endpoint: solicitudes, fallos, latencia media y máxima, códigos de estado"""
+        if not self.aggregates:
+            return
+        print(f"\n{'ENDPOINT':<50} {'REQ':>5} {'FALL':>5} {'MEDIA':>8} {'MÁX':>8}  CÓDIGOS")
+        for key, agg in sorted(self.aggregates.items()):
+            timed = sum(agg["status_codes"].values())
+            mean = f"{agg['total_ms'] / timed:.0f}" if timed else "-"
+            codes = ", ".join(f"{code}×{count}" for code, count in sorted(agg["status_codes"].items()))
+            print(f"{key:<50} {agg['count']:>5} {agg['failed']:>5} {mean:>8} {agg['max_ms']:>8.0f}  {codes}")
 
-if __name__ == "__main__":
+
+def build_validator(args, default_sample, steps=None):
+    """Compila los esquemas de respuesta una vez; None si la validación está desactivada.
+
+    Si todos los pasos elegidos carecen de esquema no se descarga la especificación.
+    """
+    if args.no_schemas or (steps and set(steps) <= UNDOCUMENTED_STEPS):
+        return None
+    from schemas import SchemaValidator, load_spec
+    try:
+        spec = load_spec(args.schema_file, args.base_url)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar la especificación OpenAPI ({str(e)}); se omite la validación de esquemas")
+        return None
+    sample = args.schema_sample if args.schema_sample is not None else default_sample
+    return SchemaValidator(spec, sample_rate=sample)
+
+
+def build_tester(args, checkpoint_path=None, steps=None):
+    tester = ApiTester(args.base_url, checkpoint_path=checkpoint_path)
+    tester.schema_validator = build_validator(args, 1.0, steps)
+    if args.metrics_port:
+        from metrics import MetricsRegistry, start_metrics_server
+        tester.metrics = MetricsRegistry()
+        start_metrics_server(tester.metrics, args.metrics_port)
+        print(f"Métricas disponibles en http://127.0.0.1:{args.metrics_port}/metrics")
+    return tester
+
+
+def parse_steps(value):
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+
+def cmd_list(args):
+    tester = ApiTester(args.base_url)
+    for name, _, setup in tester.select_plan(["check_health"]) + tester.test_plan():
+        print(f"{name}{'  (preparación)' if setup else ''}")
+
+
+def cmd_smoke(args):
     print("Iniciando pruebas de API...")
-    
-    # Permitir especificar una URL base personalizada
-    base_url = os.environ.get("API_BASE_URL", "https://web-production-8d975.up.railway.app")
-    print(f"URL base de la API: {base_url}")
-    
-    tester = ApiTester(base_url)
-    tester.run_all_tests()
\ No newline at end of file
+    tester = build_tester(args, steps=parse_steps(args.only))
+    print(f"URL base de la API: {tester.base_url}")
+    tester.run_all_tests(plan=tester.select_plan(parse_steps(args.only)), pauses=not args.no_pause)
+    failed = sum(1 for test in tester.results["tests"] if not test["success"])
+    sys.exit(1 if failed else 0)
+
+
+def soak_checkpoint(args):
+    """Fichero de checkpoint de la sesión, o None.
+
+    Los checkpoints son opcionales: solo se guardan si se pide una sesión larga
+    (--iterations) o se usa alguna opción de checkpoint. Así una ejecución
+    simple (python test_api.py, la de CI y cron) no deja una sesión a medias
+    que bloquee las siguientes.
+    """
+    if args.checkpoint:
+        return args.checkpoint
+    if args.iterations is not None or args.resume or args.fresh:
+        return DEFAULT_CHECKPOINT
+    return None
+
+
+def cmd_soak(args):
+    print("Iniciando pruebas de API...")
+    if args.resume and args.fresh:
+        print("❌ --resume y --fresh son incompatibles")
+        sys.exit(2)
+    checkpoint = soak_checkpoint(args)
+    if checkpoint and not args.resume and not args.fresh and os.path.exists(checkpoint):
+        # Relanzar tras una caída sin --resume borraría la sesión guardada
+        print(f"❌ Existe una sesión sin terminar en {checkpoint}. "
+              f"Usa --resume para continuarla o --fresh para descartarla")
+        sys.exit(1)
+
+    tester = build_tester(args, checkpoint_path=checkpoint, steps=parse_steps(args.only))
+    if args.resume:
+        if not tester.load_checkpoint():
+            print(f"⚠️ No se encontró el checkpoint {checkpoint}, iniciando una sesión nueva")
+    else:
+        # Una sesión nueva no debe mezclarse con los resultados de otra anterior
+        tester.clear_checkpoint()
+
+    print(f"URL base de la API: {tester.base_url}")
+    # Al reanudar, sin --iterations se respeta el objetivo guardado en el checkpoint
+    iterations = args.iterations
+    if iterations is None and not args.resume:
+        iterations = 1
+    tester.run_all_tests(iterations=iterations, plan=tester.select_plan(parse_steps(args.only)),
+                         pauses=not args.no_pause)
+
+
+def cmd_load(args):
+    from load_runner import run_load
+    metrics = None
+    if args.metrics_port:
+        from metrics import MetricsRegistry, start_metrics_server
+        metrics = MetricsRegistry()
+        start_metrics_server(metrics, args.metrics_port)
+        print(f"Métricas disponibles en http://127.0.0.1:{args.metrics_port}/metrics")
+    # En carga solo se valida una muestra para no restar rendimiento
+    run_load(args.base_url, parse_steps(args.only), workers=args.workers,
+             duration=args.duration, metrics=metrics,
+             validator=build_validator(args, 0.05, parse_steps(args.only)))
+
+
+def cmd_compare(args):
+    from compare import compare_reports
+    compare_reports(args.baseline, args.candidate)
+
+
+def cmd_compare_envs(args):
+    from multienv import compare_environments
+    compare_environments(args.env, only=parse_steps(args.only), rounds=args.rounds,
+                         duration=args.duration, workers=args.workers)
+
+
+def cmd_replay(args):
+    from replay import replay_report
+    tester = build_tester(args)
+    replay_report(tester, args.report, keep_timing=args.keep_timing)
+
+
+COMMANDS = ("list", "smoke", "soak", "load", "compare", "compare-envs", "replay", "ratelimit", "coldstart",
+            "contention", "report")
+
+
+def cmd_ratelimit(args):
+    from ratelimit import DEFAULT_RATES, characterize_rate_limits
+    rates = [float(rate) for rate in args.rates.split(",")] if args.rates else DEFAULT_RATES
+    characterize_rate_limits(args.base_url, groups=parse_steps(args.groups), rates=rates,
+                             seconds=args.step_seconds, ip_users=args.ip_users,
+                             max_workers=args.max_workers, cooldown=args.cooldown)
+
+
+def cmd_coldstart(args):
+    from coldstart import ColdStartServer, probe_cold_starts
+    gaps = [float(gap) for gap in args.gaps.split(",")]
+    base_url = args.base_url
+    stand_in = None
+    if args.simulate:
+        stand_in = ColdStartServer(idle_after=args.sim_idle, cold_delay=args.sim_delay,
+                                   cold_failures=args.sim_failures).start()
+        base_url = stand_in.base_url
+        print(f"Servidor simulado en {base_url} (se duerme tras {args.sim_idle:g}s)")
+    try:
+        probe_cold_starts(base_url, gaps, warmup_requests=args.warmup, endpoint=args.endpoint,
+                          cycles=args.cycles)
+    finally:
+        if stand_in:
+            stand_in.stop()
+
+
+def cmd_contention(args):
+    from contention import run_contention
+    run_contention(args.base_url, worker_counts=[int(count) for count in args.workers.split(",")],
+                   overlap=args.overlap, pool=args.pool, duration=args.duration,
+                   settings_ratio=args.settings_ratio, seed=args.seed)
+
+
+def cmd_report(args):
+    from report_html import render_report
+    paths = args.results
+    if not paths:
+        reports = sorted(glob.glob("api_test_report_*.json"))
+        if not reports:
+            print("❌ No se encontraron reportes api_test_report_*.json en el directorio actual")
+            sys.exit(1)
+        paths = reports[-1:]
+    render_report(paths, out_prefix=args.out, history_dir=args.history_dir,
+                  history_limit=args.history, window_s=args.window)
+
+
+def build_parser():
+    # Opciones de todos los subcomandos que hablan con la API
+    base = argparse.ArgumentParser(add_help=False)
+    base.add_argument("--base-url",
+                      default=os.environ.get("API_BASE_URL", "https://web-production-8d975.up.railway.app"),
+                      help="URL base de la API (por defecto: $API_BASE_URL o producción)")
+
+    # Métricas y validación de esquemas: solo en los subcomandos que las aplican,
+    # para que el resto rechace las opciones en lugar de ignorarlas
+    common = argparse.ArgumentParser(add_help=False, parents=[base])
+    common.add_argument("--metrics-port", type=int,
+                        help="Servir métricas Prometheus en http://127.0.0.1:PUERTO/metrics")
+    common.add_argument("--schema-file",
+                        help="Especificación OpenAPI exportada (por defecto se descarga de /api/docs.json)")
+    common.add_argument("--schema-sample", type=float,
+                        help="Fracción de respuestas validadas (por defecto: 1 en smoke/soak, 0.05 en carga)")
+    common.add_argument("--no-schemas", action="store_true",
+                        help="No validar las respuestas contra los esquemas OpenAPI")
+
+    parser = argparse.ArgumentParser(description="Pruebas automáticas de la API Micro SaaS")
+    subparsers = parser.add_subparsers(dest="command")
+
+    list_parser = subparsers.add_parser("list", parents=[base], help="Listar los pasos disponibles")
+    list_parser.set_defaults(func=cmd_list)
+
+    smoke = subparsers.add_parser("smoke", parents=[common],
+                                  help="Ejecutar el plan una vez (o solo algunos pasos)")
+    smoke.add_argument("--only", help="Pasos separados por comas, p. ej. check_health,get_stats")
+    smoke.add_argument("--no-pause", action="store_true", help="Sin pausas entre pasos")
+    smoke.set_defaults(func=cmd_smoke)
+
+    soak = subparsers.add_parser("soak", parents=[common], help="Repetir el plan durante horas con checkpoints")
+    soak.add_argument("--iterations", type=int,
+                      help="Número de veces que se repite el plan de pruebas "
+                           "(por defecto: 1, o el de la sesión reanudada)")
+    soak.add_argument("--resume", action="store_true",
+                      help="Continuar la sesión guardada en el checkpoint")
+    soak.add_argument("--fresh", action="store_true",
+                      help="Descartar la sesión guardada en el checkpoint y empezar de nuevo")
+    soak.add_argument("--checkpoint",
+                      help=f"Fichero de checkpoint (por defecto: {DEFAULT_CHECKPOINT} si se usa "
+                           f"--iterations, --resume o --fresh; sin ellas no se guarda checkpoint)")
+    soak.add_argument("--only", help="Pasos separados por comas")
+    soak.add_argument("--no-pause", action="store_true", help="Sin pausas entre pasos")
+    soak.set_defaults(func=cmd_soak)
+
+    load = subparsers.add_parser("load", parents=[common], help="Carga concurrente con varios usuarios")
+    load.add_argument("--workers", type=int, default=4, help="Usuarios concurrentes")
+    load.add_argument("--duration", type=float, default=60, help="Duración en segundos")
+    load.add_argument("--only", help="Pasos separados por comas")
+    load.set_defaults(func=cmd_load)
+
+    compare = subparsers.add_parser("compare", help="Comparar dos reportes JSON guardados")
+    compare.add_argument("baseline", help="Reporte de referencia")
+    compare.add_argument("candidate", help="Reporte a comparar")
+    compare.set_defaults(func=cmd_compare)
+
+    compare_envs = subparsers.add_parser("compare-envs",
+                                         help="Ejecutar el mismo escenario contra varias URLs a la vez")
+    compare_envs.add_argument("--env", action="append", required=True,
+                              help="Entorno como nombre=url; repetir para cada entorno")
+    compare_envs.add_argument("--rounds", type=int, default=3,
+                              help="Fases en que se divide la duración; el orden de arranque rota en cada una")
+    compare_envs.add_argument("--duration", type=float, default=30,
+                              help="Segundos de carga simultánea por entorno")
+    compare_envs.add_argument("--workers", type=int, default=1, help="Usuarios concurrentes por entorno")
+    compare_envs.add_argument("--only", help="Pasos separados por comas")
+    compare_envs.set_defaults(func=cmd_compare_envs)
+
+    replay = subparsers.add_parser("replay", parents=[common], help="Repetir las solicitudes de un reporte guardado")
+    replay.add_argument("report", help="Reporte JSON a repetir")
+    replay.add_argument("--keep-timing", action="store_true",
+                        help="Respetar los intervalos originales entre solicitudes")
+    replay.set_defaults(func=cmd_replay)
+
+    ratelimit = subparsers.add_parser("ratelimit", parents=[base],
+                                      help="Medir los límites de tasa efectivos por grupo de rutas")
+    ratelimit.add_argument("--groups", help="Grupos separados por comas (health,auth,sites,logs,stats,monitor)")
+    ratelimit.add_argument("--rates", help="Tasas del ramp en solicitudes/s, p. ej. 1,2,5,10,20,50")
+    ratelimit.add_argument("--step-seconds", type=float, default=10, help="Duración de cada escalón")
+    ratelimit.add_argument("--ip-users", type=int, default=5,
+                           help="Usuarios entre los que se reparte la carga en el alcance por IP")
+    ratelimit.add_argument("--max-workers", type=int, default=32, help="Solicitudes simultáneas máximas")
+    ratelimit.add_argument("--cooldown", type=float, default=5,
+                           help="Pausa mínima entre grupos para que se libere el limitador")
+    ratelimit.set_defaults(func=cmd_ratelimit)
+
+    coldstart = subparsers.add_parser("coldstart", parents=[base],
+                                      help="Medir la latencia de la primera solicitud tras inactividad")
+    coldstart.add_argument("--gaps", default="0,60,300,900",
+                           help="Segundos de inactividad antes de cada sonda (0 = justo tras un despliegue)")
+    coldstart.add_argument("--warmup", type=int, default=20,
+                           help="Solicitudes de la curva de calentamiento tras la primera")
+    coldstart.add_argument("--endpoint", default="/health", help="Endpoint sondeado")
+    coldstart.add_argument("--cycles", type=int, default=1, help="Veces que se repite la secuencia de intervalos")
+    coldstart.add_argument("--simulate", action="store_true",
+                           help="Usar un servidor local que simula arranques en frío en lugar de la API")
+    coldstart.add_argument("--sim-idle", type=float, default=5, help="Inactividad que duerme al servidor simulado")
+    coldstart.add_argument("--sim-delay", type=float, default=2, help="Duración del arranque simulado (s)")
+    coldstart.add_argument("--sim-failures", type=int, default=1,
+                           help="Respuestas 502 del servidor simulado al despertar")
+    coldstart.set_defaults(func=cmd_coldstart)
+
+    contention = subparsers.add_parser("contention", parents=[base],
+                                       help="Medir escrituras concurrentes sobre sitios compartidos")
+    contention.add_argument("--workers", default="1,4,16",
+                            help="Clientes concurrentes por ronda, separados por comas")
+    contention.add_argument("--overlap", default="high",
+                            help="high (todos sobre los mismos sitios), low (un sitio por cliente) o 0-1")
+    contention.add_argument("--pool", type=int,
+                            help="Sitios compartidos (por defecto: 1 con high, un sitio por cliente con low)")
+    contention.add_argument("--duration", type=float, default=30, help="Duración de cada ronda en segundos")
+    contention.add_argument("--settings-ratio", type=float, default=0.0,
+                            help="Fracción de escrituras a /api/monitor/site/:id/settings "
+                                 "(hoy responde 500; solo aporta latencia y errores)")
+    contention.add_argument("--seed", type=int, default=1, help="Semilla para elegir sitios y operaciones")
+    contention.set_defaults(func=cmd_contention)
+
+    report = subparsers.add_parser("report", help="Generar un reporte HTML con gráficas y una exportación CSV")
+    report.add_argument("results", nargs="*",
+                        help="Reportes JSON o ficheros JSONL de resultados (por defecto: el reporte más reciente)")
+    report.add_argument("--out", help="Prefijo de los ficheros generados (por defecto: el del último reporte)")
+    report.add_argument("--history-dir", help="Directorio con los reportes anteriores a comparar")
+    report.add_argument("--history", type=int, default=5, help="Número de ejecuciones anteriores a comparar")
+    report.add_argument("--window", type=int, default=60,
+                        help="Tamaño en segundos de las ventanas de percentiles en el tiempo")
+    report.set_defaults(func=cmd_report)
+
+    return parser
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        # Sin subcomando se mantiene el comportamiento original: el plan completo
+        argv = ["soak"] + argv
+
+    args = build_parser().parse_args(argv)
+    args.func(args)
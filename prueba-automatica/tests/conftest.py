@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos de prueba-automatica se importan por nombre, como al ejecutar test_api.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+import pytest
+
+from test_api import DEFAULT_CHECKPOINT, ApiTester, build_parser, soak_checkpoint
+
+
+class FlakyTester(ApiTester):
+    """Probador sin red: cada paso registra un resultado y puede fallar a demanda"""
+
+    fail_at = None
+
+    def test_plan(self):
+        return [("step_a", 0, False), ("step_b", 0, False)]
+
+    def step_a(self):
+        self.add_result("/a", "GET", response={"ok": True})
+
+    def step_b(self):
+        if (self.iteration, "step_b") == self.fail_at:
+            raise RuntimeError("caída simulada")
+        self.add_result("/b", "GET", response={"ok": True})
+
+
+
+def test_resume_keeps_iteration_target(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = str(tmp_path / "session.json")
+
+    crashed = FlakyTester("http://example.invalid", checkpoint_path=checkpoint)
+    crashed.fail_at = (3, "step_b")
+    with pytest.raises(SystemExit):
+        crashed.run_all_tests(iterations=10, pauses=False)
+
+    resumed = FlakyTester("http://example.invalid", checkpoint_path=checkpoint)
+    assert resumed.load_checkpoint()
+    assert (resumed.iteration, resumed.iterations, resumed.completed_steps) == (3, 10, ["step_a"])
+
+    # Sin iterations explícitas se completan las 10 guardadas
+    resumed.run_all_tests(pauses=False)
+    assert resumed.iteration == 11
+    assert len(resumed.results["tests"]) == 20
+    # Los agregados restaurados siguen acumulando sobre los de antes de la caída
+    assert {key: agg["count"] for key, agg in resumed.aggregates.items()} == {"GET /a": 10, "GET /b": 10}
+    assert not (tmp_path / "session.json").exists()
+
+
+def test_soak_refuses_to_discard_unfinished_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "session.json").write_text("{}")
+
+    args = build_parser().parse_args(["soak", "--checkpoint", "session.json", "--no-schemas"])
+    with pytest.raises(SystemExit) as exit_info:
+        args.func(args)
+    assert exit_info.value.code == 1
+    assert (tmp_path / "session.json").exists()
+
+
+def test_plain_runs_do_not_checkpoint():
+    parser = build_parser()
+    assert soak_checkpoint(parser.parse_args(["soak"])) is None
+    assert soak_checkpoint(parser.parse_args(["soak", "--only", "get_stats"])) is None
+    assert soak_checkpoint(parser.parse_args(["soak", "--iterations", "3"])) == DEFAULT_CHECKPOINT
+    assert soak_checkpoint(parser.parse_args(["soak", "--resume"])) == DEFAULT_CHECKPOINT
+    assert soak_checkpoint(parser.parse_args(["soak", "--checkpoint", "s.json"])) == "s.json"
+
+
+def test_summary_reads_aggregates(capsys):
+    tester = ApiTester("http://example.invalid")
+    tester.add_result("/a", "GET", response={"ok": True})
+    tester.add_result("/a", "GET", response="timeout", success=False)
+    tester.summarize_results()
+    output = capsys.readouterr().out
+    assert "Total de pruebas ejecutadas: 2" in output
+    assert "- GET /a (1/2)" in output
@@ -0,0 +1,19 @@
+import pytest
+
+from test_api import build_parser
+
+
+@pytest.mark.parametrize("command", ["ratelimit", "coldstart", "contention", "list"])
+@pytest.mark.parametrize("option", [["--metrics-port", "9100"], ["--schema-file", "openapi.json"],
+                                    ["--schema-sample", "0.5"], ["--no-schemas"]])
+def test_commands_reject_options_they_do_not_apply(command, option):
+    with pytest.raises(SystemExit) as exit_info:
+        build_parser().parse_args([command] + option)
+    assert exit_info.value.code == 2
+
+
+def test_requesting_commands_keep_shared_options():
+    args = build_parser().parse_args(["ratelimit", "--base-url", "http://localhost:3000"])
+    assert args.base_url == "http://localhost:3000"
+    args = build_parser().parse_args(["smoke", "--metrics-port", "9100", "--no-schemas"])
+    assert (args.metrics_port, args.no_schemas) == (9100, True)
@@ -0,0 +1,48 @@
+import pytest
+
+import coldstart
+from coldstart import ColdStartServer, probe_cold_starts, probe_once
+
+
+@pytest.fixture
+def stand_in():
+    # idle_after supera la pausa de 1 s entre reintentos de probe_once
+    server = ColdStartServer(idle_after=1.5, cold_delay=0.3, cold_failures=1,
+                             base_latency=0.005, warm_penalty=0.05).start()
+    yield server
+    server.stop()
+
+
+def test_first_request_after_sleep_is_cold(stand_in):
+    probe = probe_once(stand_in.base_url, "/health", warmup_requests=6)
+    assert probe["first_status"] == 502
+    assert probe["first_ms"] >= 300
+    assert probe["attempts_to_success"] == 2
+    # La curva de calentamiento baja hasta la latencia base
+    assert probe["warmup_curve_ms"][0] > probe["steady_ms"]
+    assert probe["steady_ms"] < 100
+    assert probe["cold_penalty_ms"] > 200
+
+
+def test_keep_warm_recommendation(stand_in, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = probe_cold_starts(stand_in.base_url, gaps=[0, 0.3, 2.0], warmup_requests=4,
+                               penalty_threshold_ms=200)
+
+    first = {probe["gap_s"]: probe["first_status"] for probe in report["probes"]}
+    assert first == {0: 502, 0.3: 200, 2.0: 502}
+    assert "calentar el servicio después de cada despliegue" in report["recommendation"]
+    assert "a partir de 2s de inactividad: enviar un ping keep-warm cada 0.3s" in report["recommendation"]
+    assert list(tmp_path.glob("api_coldstart_report_*.json"))
+
+
+def test_session_is_ready_before_the_first_timed_request(stand_in, monkeypatch):
+    timed = coldstart.timed_request
+
+    def checked(tester, endpoint, timeout):
+        assert tester.session is not None
+        return timed(tester, endpoint, timeout)
+
+    monkeypatch.setattr(coldstart, "timed_request", checked)
+    probe = probe_once(stand_in.base_url, "/health", warmup_requests=2)
+    assert probe["first_status"] == 502
@@ -0,0 +1,42 @@
+from contention import check_lost_updates, summarize_writes
+
+
+def write(site, op, value, start, end, status=200):
+    return {"site": site, "op": op, "value": value, "status": status, "start": start, "end": end,
+            "ms": (end - start) * 1000}
+
+
+WRITES = [
+    write("s1", "name", "a", 0.0, 1.0),
+    write("s1", "name", "b", 2.0, 3.0),
+    write("s1", "url", "u1", 0.0, 2.5),
+    write("s1", "url", "u2", 2.0, 3.0),
+    write("s1", "url", "u3", 4.0, 5.0, status=500),
+    write("s2", "name", "c", 0.0, 1.0),
+    write("s2", "name", "d", 0.5, 1.5),
+]
+
+
+def test_lost_updates_are_checked_per_field():
+    finals = {"s1": {"name": "a", "url": "u1"}, "s2": {"name": "c", "url": None}}
+    outcome = check_lost_updates(WRITES, finals)
+
+    # "a" terminó antes de que empezara "b": se perdió la escritura confirmada de "b"
+    assert outcome["name"]["sites"]["s1"]["verdict"] == "lost"
+    # "c" y "d" se solaparon: cualquiera de las dos pudo ser la última
+    assert outcome["name"]["sites"]["s2"]["verdict"] == "verified"
+    # "u1" terminó después de que empezara "u2"
+    assert outcome["url"]["sites"]["s1"]["verdict"] == "verified"
+    assert "s2" not in outcome["url"]["sites"]
+
+
+def test_failed_write_that_landed_is_reported():
+    outcome = check_lost_updates(WRITES, {"s1": {"name": "x", "url": "u3"}})
+    assert outcome["url"]["applied_despite_error"] == 1
+    assert outcome["name"]["unknown"] == 1
+
+
+def test_summary_skips_settings_when_not_sent():
+    summary = summarize_writes(WRITES, elapsed=5.0)
+    assert list(summary) == ["name", "url"]
+    assert (summary["url"]["requests"], summary["url"]["acked"], summary["url"]["errors"]) == (3, 2, 1)
@@ -0,0 +1,91 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics import MetricsRegistry, start_metrics_server
+
+NAME = "api_tester_request_duration_seconds"
+LABELS = 'endpoint="/api/sites/:id",method="GET",status="200"'
+
+
+def sample_lines(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def finished(registry, seconds, endpoint="/api/sites/:id", method="GET", status=200):
+    registry.request_started(endpoint, method)
+    registry.request_finished(endpoint, method, status, seconds)
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 0.5, 1.0))
+    # 0.1 cae justo en un límite (le es "menor o igual"); 3.0 supera el último
+    for seconds in (0.05, 0.1, 0.3, 3.0):
+        finished(registry, seconds)
+    samples = sample_lines(registry.render())
+
+    assert samples[f'{NAME}_bucket{{{LABELS},le="0.1"}}'] == "2"
+    assert samples[f'{NAME}_bucket{{{LABELS},le="0.5"}}'] == "3"
+    assert samples[f'{NAME}_bucket{{{LABELS},le="1.0"}}'] == "3"
+    assert samples[f'{NAME}_bucket{{{LABELS},le="+Inf"}}'] == "4"
+    assert samples[f"{NAME}_count{{{LABELS}}}"] == "4"
+    assert float(samples[f"{NAME}_sum{{{LABELS}}}"]) == pytest.approx(3.45)
+    assert samples[f"api_tester_requests_total{{{LABELS}}}"] == "4"
+
+
+def test_in_flight_gauge_returns_to_zero():
+    registry = MetricsRegistry()
+    registry.request_started("/health", "GET")
+    gauge = 'api_tester_requests_in_flight{endpoint="/health",method="GET"}'
+    assert sample_lines(registry.render())[gauge] == "1"
+    registry.request_finished("/health", "GET", "error", 0.2)
+    samples = sample_lines(registry.render())
+    assert samples[gauge] == "0"
+    assert samples['api_tester_requests_total{endpoint="/health",method="GET",status="error"}'] == "1"
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    finished(registry, 0.01, endpoint='/api/logs?q="a\\b"\n')
+    assert 'endpoint="/api/logs?q=\\"a\\\\b\\"\\n"' in registry.render()
+
+
+def test_server_exposes_metrics():
+    registry = MetricsRegistry()
+    finished(registry, 0.2)
+    server = start_metrics_server(registry, 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert f"api_tester_requests_total{{{LABELS}}} 1" in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}/otra")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class StubSession:
+    def request(self, method, url, **kwargs):
+        response = type("Response", (), {})()
+        response.status_code = 200
+        return response
+
+
+def test_tester_labels_match_report_routes():
+    from test_api import ApiTester
+
+    tester = ApiTester("http://example.invalid")
+    tester.site_id = "67fbd1511abb480eb7a0"
+    tester.session = StubSession()
+    tester.metrics = MetricsRegistry()
+    # Un ID ajeno al sitio del probador también se agrupa bajo ':id'
+    tester.send_request("GET", "/api/monitor/site/0123456789abcdef0123/history")
+    tester.add_result("/api/monitor/site/0123456789abcdef0123/history", "GET", response={"ok": True})
+
+    assert 'endpoint="/api/monitor/site/:id/history",method="GET",status="200"' in tester.metrics.render()
+    assert list(tester.aggregates) == ["GET /api/monitor/site/:id/history"]
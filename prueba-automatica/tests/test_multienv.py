@@ -0,0 +1,52 @@
+import pytest
+
+from coldstart import ColdStartServer
+from multienv import compare_environments, parse_envs, print_side_by_side
+
+
+def test_parse_envs():
+    assert parse_envs(["staging=http://localhost:3000/", "https://api.example.com"]) == [
+        ("staging", "http://localhost:3000"), ("api.example.com", "https://api.example.com")]
+    with pytest.raises(ValueError):
+        parse_envs(["a=http://one", "a=http://two"])
+
+
+def entry(p50, rps, errors=0):
+    return {"requests": 10, "errors": errors, "rps": rps,
+            "latency_ms": {"p50": p50, "p95": p50 * 2, "p99": p50 * 3}}
+
+
+def test_side_by_side_shows_latency_and_throughput(capsys):
+    print_side_by_side({
+        "prod": {"GET /health": entry(10, 95.2)},
+        "staging": {"GET /health": entry(30, 31.7, errors=2), "GET /api/stats": entry(5, 12)},
+    })
+    output = capsys.readouterr().out
+    health = next(line for line in output.splitlines() if line.startswith("GET /health"))
+    assert "95.2" in health and "31.7" in health
+    assert "staging: p50 +200% respecto a prod" in output
+    stats = next(line for line in output.splitlines() if line.startswith("GET /api/stats"))
+    assert " - " in stats
+
+
+def stand_in(latency):
+    return ColdStartServer(idle_after=3600, cold_delay=0, base_latency=latency, warm_penalty=0).start()
+
+
+def test_throughput_is_measured_over_a_concurrent_phase(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fast, slow = stand_in(0.01), stand_in(0.05)
+    try:
+        report = compare_environments([f"fast={fast.base_url}", f"slow={slow.base_url}"],
+                                      only=["check_health"], rounds=2, duration=1.0, workers=2)
+    finally:
+        fast.stop()
+        slow.stop()
+
+    assert report["duration_s"] == pytest.approx(1.0, abs=0.3)
+    fast_entry = report["endpoints"]["fast"]["GET /health"]
+    slow_entry = report["endpoints"]["slow"]["GET /health"]
+    # Con dos usuarios por entorno el rendimiento es solicitudes / duración, no 1000 / latencia media
+    assert fast_entry["rps"] == pytest.approx(fast_entry["requests"] / report["duration_s"], rel=0.01)
+    assert fast_entry["rps"] > 2 * slow_entry["rps"] > 0
+    assert slow_entry["rps"] > 1000 / slow_entry["latency_ms"]["p50"]
@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ratelimit import RateProbe, describe_limit, ramp
+
+
+def fixed_window_server(limit, window_s, headers=True):
+    """Servidor con una cuota de ventana fija como express-rate-limit (standardHeaders)"""
+    state = {"start": None, "hits": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            now = time.monotonic()
+            with lock:
+                if state["start"] is None or now - state["start"] >= window_s:
+                    state["start"], state["hits"] = now, 0
+                state["hits"] += 1
+                hits = state["hits"]
+                reset = max(0, round(state["start"] + window_s - now))
+            status = 429 if hits > limit else 200
+            body = json.dumps({"success": status == 200}).encode("utf-8")
+            self.send_response(status)
+            if headers:
+                self.send_header("RateLimit-Policy", f"{limit};w={window_s}")
+                self.send_header("RateLimit-Limit", str(limit))
+                self.send_header("RateLimit-Remaining", str(max(0, limit - hits)))
+                self.send_header("RateLimit-Reset", str(reset))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_fixed_window_quota_is_reported_per_window():
+    server = fixed_window_server(limit=12, window_s=600)
+    try:
+        probe = RateProbe(f"http://127.0.0.1:{server.server_address[1]}", "GET", "/api/logs", [None])
+        result = ramp(probe, rates=(5, 10, 20), seconds=1, max_workers=4,
+                      cliff_factor=100, error_ratio=0.5, cooldown=0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    quota = result["quota"]
+    assert result["limited_by"] == "429"
+    assert quota["kind"] == "window"
+    assert (quota["limit"], quota["window_s"], quota["requests_before_limit"]) == (12, 600, 12)
+    # Agotar la cuota en el segundo escalón no es un límite de 10 rps
+    assert result["max_clean_rps"] is None and result["limited_at_rps"] is None
+
+
+def test_short_window_is_a_rate():
+    quota = describe_limit(50, 4.0, {"RateLimit-Limit": "10", "RateLimit-Policy": "10;w=1"}, step_seconds=10)
+    assert quota["kind"] == "rate" and quota["limit_rps"] == 10
+
+
+def test_window_estimated_from_reset_without_policy():
+    quota = describe_limit(100, 30.0, {"RateLimit-Limit": "100", "RateLimit-Reset": "570"}, step_seconds=10)
+    assert (quota["kind"], quota["window_s"]) == ("window", 600)
+
+
+def test_quota_without_headers_uses_observed_count():
+    quota = describe_limit(37, 12.5, {}, step_seconds=10)
+    assert (quota["limit"], quota["limit_source"], quota["window_s"]) == (37, "observed", None)
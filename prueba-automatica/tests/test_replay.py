@@ -0,0 +1,47 @@
+import datetime
+import json
+
+from replay import find_original_site_id, replay_report
+from test_api import ApiTester
+
+SITE_ID = "67fbd1511abb480eb7a0"
+
+
+def test_original_site_id_skips_unusable_responses():
+    tests = [
+        {"method": "POST", "endpoint": "/api/sites", "response": "HTTPSConnectionPool: Read timed out"},
+        {"method": "POST", "endpoint": "/api/sites", "response": {"success": False, "data": {"site": None}}},
+        {"method": "POST", "endpoint": "/api/sites", "response": {"data": {"site": {"id": SITE_ID}}}},
+    ]
+    assert find_original_site_id(tests) == SITE_ID
+    assert find_original_site_id(tests[:2]) is None
+
+
+class FakeResponse:
+    status_code = 201
+    text = "<html>Created</html>"
+    headers = {}
+    elapsed = datetime.timedelta(milliseconds=12)
+
+    def json(self):
+        raise ValueError("no es JSON")
+
+
+class OfflineTester(ApiTester):
+    def send_request(self, method, endpoint, payload=None, timeout=20):
+        return FakeResponse()
+
+    def generate_report(self, format="json"):
+        pass
+
+
+def test_replay_survives_non_json_bodies(tmp_path):
+    report = tmp_path / "api_test_report_1.json"
+    report.write_text(json.dumps({"timestamp": "2025-04-13T10:00:00", "tests": [
+        {"method": "POST", "endpoint": "/api/sites", "timestamp": "2025-04-13T10:00:00",
+         "payload": {"name": "x"}, "status_code": 201, "success": True},
+    ]}))
+    tester = OfflineTester("http://example.invalid")
+    tester.keep_bodies = False
+    replay_report(tester, str(report))
+    assert [test["status_code"] for test in tester.results["tests"]] == [201]
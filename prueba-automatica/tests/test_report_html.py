@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from report_html import find_history, render_report
+from results import iter_json_array
+
+REPORT = {
+    "timestamp": "2025-04-13T10:00:00",
+    "meta": {"tests": [{"nested": True}], "note": "a \"tests\" string"},
+    "tests": [
+        {"endpoint": "/api/stats", "method": "GET", "timestamp": "2025-04-13T10:00:01",
+         "success": True, "status_code": 200, "duration_ms": 2.5e3, "response": {"items": [1, 2, {"x": -0.5}]}},
+        {"endpoint": "/api/sites/67fbd1511abb480eb7a0", "method": "PUT", "timestamp": "2025-04-13T10:00:02",
+         "success": False, "status_code": 500, "duration_ms": 12, "notes": "fallo ]} ,"},
+    ],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1 << 16])
+def test_streamed_array_matches_json_load(chunk_size):
+    text = json.dumps(REPORT, indent=2)
+    assert list(iter_json_array(io.StringIO(text), "tests", chunk_size=chunk_size)) == REPORT["tests"]
+
+
+def write_report(directory, stamp):
+    path = directory / f"api_test_report_{stamp}.json"
+    path.write_text(json.dumps(REPORT))
+    return str(path)
+
+
+def test_history_only_includes_earlier_runs(tmp_path):
+    older = [write_report(tmp_path, stamp) for stamp in (1000, 1500, 1800)]
+    current = write_report(tmp_path, 2000)
+    write_report(tmp_path, 3000)
+
+    assert find_history([current], str(tmp_path), 5) == older
+    assert find_history([current], str(tmp_path), 2) == older[1:]
+    # Sin marca en el nombre se usa el inicio de la ejecución
+    assert find_history([str(tmp_path / "session.results.jsonl")], str(tmp_path), 5, started=1600) == older[:2]
+
+
+def test_report_compares_with_the_previous_run(tmp_path):
+    write_report(tmp_path, 1000)
+    current = write_report(tmp_path, 2000)
+    write_report(tmp_path, 3000)
+
+    html_path, csv_path = render_report([current], out_prefix=str(tmp_path / "out"))
+    page = open(html_path, encoding="utf-8").read()
+    assert "Comparado con: api_test_report_1000.json" in page
+    assert "api_test_report_3000.json" not in page
+    assert open(csv_path).read().count("\n") == 3
@@ -0,0 +1,90 @@
+import datetime
+
+import schemas
+from schemas import SchemaValidator, compile_schema
+from test_api import ApiTester, build_parser, build_validator
+
+SITE = {"type": "object", "required": ["id"],
+        "properties": {"id": {"type": "string"}, "status": {"type": "string", "enum": ["active", "paused"]}}}
+
+SPEC = {
+    "components": {"schemas": {"Site": SITE}},
+    "paths": {
+        "/api/sites": {"get": {"responses": {"200": {"content": {"application/json": {"schema": {
+            "type": "object",
+            "properties": {"data": {"type": "object", "properties": {
+                "sites": {"type": "array", "items": {"$ref": "#/components/schemas/Site"}}}}},
+        }}}}}}},
+        "/api/sites/{id}": {"get": {"responses": {"200": {"content": {"application/json": {"schema": {
+            "$ref": "#/components/schemas/Site"}}}}}}},
+    },
+}
+
+
+def validate(schema, value):
+    errors = []
+    compile_schema(schema, SPEC)(value, "$", errors)
+    return errors
+
+
+def test_compiled_schema_reports_paths():
+    assert validate(SITE, {"id": "a", "status": "active"}) == []
+    assert validate(SITE, {"status": "gone"}) == ["$.id: campo obligatorio ausente",
+                                                  "$.status: valor 'gone' fuera de ['active', 'paused']"]
+    assert validate({"type": "string", "nullable": True}, None) == []
+    assert validate({"oneOf": [{"type": "string"}, {"type": "integer"}]}, 1.5) == [
+        "$: no coincide con ninguna alternativa"]
+
+
+def test_route_templates_and_refs():
+    validator = SchemaValidator(SPEC)
+    body = {"data": {"sites": [{"id": "x"}, {"status": "active"}]}}
+    assert validator.validate("GET", "/api/sites", 200, lambda: body) == ["$.data.sites[1].id: campo obligatorio ausente"]
+    assert validator.validate("GET", "/api/sites/67fbd1511abb480eb7a0?x=1", 200, lambda: {"id": "x"}) == []
+    # Sin esquema para el estado o la ruta no se valida
+    assert validator.validate("GET", "/api/sites", 500, lambda: {}) is None
+    assert validator.validate("GET", "/health", 200, lambda: {}) is None
+
+
+def test_sampling_covers_every_route():
+    spec = {"paths": {f"/e{index}": {"get": {"responses": {"200": {"content": {"application/json": {
+        "schema": {"type": "object"}}}}}}} for index in range(5)}}
+    validator = SchemaValidator(spec, sample_rate=0.05)
+    validated = {}
+    for turn in range(1000):
+        # Las respuestas sin esquema no deben desplazar la muestra
+        validator.validate("GET", "/health", 200, dict)
+        endpoint = f"/e{turn % 5}"
+        if validator.validate("GET", endpoint, 200, dict) is not None:
+            validated[endpoint] = validated.get(endpoint, 0) + 1
+    assert validated == {f"/e{index}": 10 for index in range(5)}
+
+
+def test_health_only_runs_skip_loading_the_spec(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("no debería descargarse la especificación")
+    monkeypatch.setattr(schemas, "load_spec", fail)
+    args = build_parser().parse_args(["smoke", "--only", "check_health", "--base-url", "http://example.invalid"])
+    assert build_validator(args, 1.0, ["check_health"]) is None
+
+
+class CountingResponse:
+    status_code = 200
+    text = '{"data": {"sites": [{"id": "x"}]}}'
+
+    def __init__(self):
+        self.elapsed = datetime.timedelta(milliseconds=5)
+        self.decoded = 0
+
+    def json(self):
+        self.decoded += 1
+        return {"data": {"sites": [{"id": "x"}]}}
+
+
+def test_body_is_decoded_once():
+    tester = ApiTester("http://example.invalid")
+    tester.schema_validator = SchemaValidator(SPEC)
+    response = CountingResponse()
+    result = tester.add_result("/api/sites", "GET", response=response)
+    assert result["success"] and "schema_errors" not in result
+    assert response.decoded == 1
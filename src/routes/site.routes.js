@@ -42,32 +42,38 @@ router.use(protect);
  *                 success:
  *                   type: boolean
  *                   example: true
- *                 count:
- *                   type: integer
- *                   example: 2
+ *                 message:
+ *                   type: string
+ *                   example: Sites retrieved successfully
  *                 data:
- *                   type: array
- *                   items:
- *                     type: object
- *                     properties:
- *                       _id:
- *                         type: string
- *                         example: 60d21b4667d0d8992e610c85
- *                       name:
- *                         type: string
- *                         example: Mi Sitio Web
- *                       url:
- *                         type: string
- *                         example: https://example.com
- *                       userId:
- *                         type: string
- *                         example: 60d21b4667d0d8992e610c85
- *                       createdAt:
- *                         type: string
- *                         format: date-time
- *                       updatedAt:
- *                         type: string
- *                         format: date-time
+ *                   type: object
+ *                   properties:
+ *                     sites:
+ *                       type: array
+ *                       items:
+ *                         type: object
+ *                         properties:
+ *                           id:
+ *                             type: string
+ *                             example: 67fbd1511abb480eb7a0
+ *                           name:
+ *                             type: string
+ *                             example: Mi Sitio Web
+ *                           url:
+ *                             type: string
+ *                             example: https://example.com
+ *                           userId:
+ *                             type: string
+ *                             example: 67fbd14f5ad43c077835
+ *                           status:
+ *                             type: string
+ *                             example: active
+ *                           createdAt:
+ *                             type: string
+ *                             format: date-time
+ *                           updatedAt:
+ *                             type: string
+ *                             format: date-time
  *       401:
  *         description: No autorizado
  *         content: